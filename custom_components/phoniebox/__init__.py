@@ -12,8 +12,20 @@ from typing import TYPE_CHECKING
 
 from homeassistant.exceptions import ConfigEntryNotReady
 
-from .const import CONF_MQTT_BASE_TOPIC, DOMAIN, LOGGER, PLATFORMS
+from .const import (
+    CONF_COMMAND_BURST,
+    CONF_COMMAND_RATE,
+    CONF_INGESTION_MODE,
+    CONF_MQTT_BASE_TOPIC,
+    DEFAULT_COMMAND_BURST,
+    DEFAULT_COMMAND_RATE,
+    DEFAULT_INGESTION_MODE,
+    DOMAIN,
+    LOGGER,
+    PLATFORMS,
+)
 from .data_coordinator import DataCoordinator
+from .descriptors import update_intervals
 from .mqtt_client import MqttClient
 
 if TYPE_CHECKING:
@@ -100,6 +112,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # Store enabled platforms in coordinator
     coordinator.platforms = enabled_platforms.copy()
+    _apply_options(coordinator, entry)
 
     LOGGER.info("Enabled platforms: %s", enabled_platforms)
 
@@ -115,13 +128,29 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             msg = f"Failed to set up platforms: {err}"
             raise ConfigEntryNotReady(msg) from err
 
+    # Subscribe once all platforms registered their message handlers, so that
+    # retained messages replayed by the broker reach every platform
+    await coordinator.async_subscribe()
+
     # Register update listener for config changes
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
 
     LOGGER.info("Phoniebox integration setup completed successfully")
     return True
 
 
+def _apply_options(coordinator: DataCoordinator, entry: ConfigEntry) -> None:
+    """Hand the options that need no reload to the coordinator."""
+    coordinator.async_set_update_intervals(update_intervals(entry.options))
+    coordinator.async_set_ingestion_mode(
+        entry.options.get(CONF_INGESTION_MODE, DEFAULT_INGESTION_MODE)
+    )
+    coordinator.mqtt_client.commands.async_set_rate_limit(
+        entry.options.get(CONF_COMMAND_RATE, DEFAULT_COMMAND_RATE),
+        entry.options.get(CONF_COMMAND_BURST, DEFAULT_COMMAND_BURST),
+    )
+
+
 def _get_enabled_platforms(
     entry: ConfigEntry, available_platforms: Sequence[str]
 ) -> list[str]:
@@ -189,6 +218,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
         if unloaded:
             hass.data[DOMAIN].pop(entry.entry_id)
+            coordinator.async_shutdown()
             LOGGER.info("Successfully unloaded Phoniebox integration")
             return True
         LOGGER.warning("Some platforms failed to unload properly")
@@ -202,12 +232,64 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         return False
 
 
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """
+    Apply changed options without reloading the config entry.
+
+    Only the platforms that were toggled are loaded or unloaded and the
+    update intervals are handed to the coordinator. The data coordinator, MQTT
+    client, subscriptions and the entities of untouched platforms are kept,
+    so their state stays available throughout.
+
+    Args:
+    ----
+        hass: The Home Assistant instance
+        entry: The config entry whose options changed
+
+    """
+    coordinator: DataCoordinator | None = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if coordinator is None:
+        await async_reload_entry(hass, entry)
+        return
+
+    _apply_options(coordinator, entry)
+
+    enabled_platforms = _get_enabled_platforms(entry, PLATFORMS)
+    removed = [p for p in coordinator.platforms if p not in enabled_platforms]
+    added = [p for p in enabled_platforms if p not in coordinator.platforms]
+    LOGGER.info(
+        "Updating options for entry %s: adding %s, removing %s",
+        entry.entry_id,
+        added,
+        removed,
+    )
+
+    if removed:
+        if not await hass.config_entries.async_unload_platforms(entry, removed):
+            LOGGER.warning("Some platforms failed to unload, reloading entry")
+            await async_reload_entry(hass, entry)
+            return
+        for platform in removed:
+            coordinator.async_release_platform(platform)
+
+    coordinator.platforms = enabled_platforms
+    if added:
+        # Newly loaded platforms catch up from the payloads the coordinator
+        # already received while registering their handlers
+        await hass.config_entries.async_forward_entry_setups(entry, added)
+
+    # Follow the topics the enabled platforms consume
+    await coordinator.async_subscribe()
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """
     Reload a config entry.
 
-    This function performs a complete reload by first unloading the entry
-    and then setting it up again with the current configuration.
+    This function performs a complete reload through the config entries
+    manager, so that everything registered with ``entry.async_on_unload``
+    (update listener, message handlers) is released before the entry is set
+    up again with the current configuration.
 
     Args:
     ----
@@ -223,8 +305,7 @@ async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     LOGGER.info("Reloading Phoniebox integration for entry: %s", entry.entry_id)
 
     try:
-        await async_unload_entry(hass, entry)
-        await async_setup_entry(hass, entry)
+        await hass.config_entries.async_reload(entry.entry_id)
         LOGGER.info("Successfully reloaded Phoniebox integration")
     except Exception as err:
         LOGGER.error("Failed to reload integration: %s", err)
@@ -11,34 +11,38 @@ from homeassistant.components.binary_sensor import (
 from homeassistant.core import HomeAssistant, callback
 
 from .const import (
-    BOOLEAN_SENSORS,
+    BINARY_SENSOR,
     CONF_PHONIEBOX_NAME,
     DOMAIN,
     LOGGER,
-    TOPIC_LENGTH_PLAYER_STATE,
 )
+from .descriptors import keys_for_platform
 from .entity import PhonieboxEntity
-from .utils import create_entity_slug, create_mqtt_context, handle_mqtt_entity_by_type
+from .utils import (
+    EntityAddBatcher,
+    create_entity_slug,
+    create_mqtt_context,
+    handle_mqtt_entity_by_type,
+    update_discovered_entity,
+)
 
 if TYPE_CHECKING:
-    from homeassistant.components.mqtt.models import ReceiveMessage
     from homeassistant.config_entries import ConfigEntry
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-    from .data_coordinator import DataCoordinator
+    from .data_coordinator import DataCoordinator, PhonieboxMessage
 
 
 def discover_sensors(
-    topic: str, entry: ConfigEntry, coordinator: DataCoordinator
+    message: PhonieboxMessage, entry: ConfigEntry, coordinator: DataCoordinator
 ) -> BinaryPhonieboxSensor | None:
-    """Based on the topic and entry create the correct binary sensor."""
-    parts = topic.split("/")
-    domain = parts[2] if len(parts) == TOPIC_LENGTH_PLAYER_STATE else parts[1]
+    """Based on the message and entry create the correct binary sensor."""
+    descriptor = message.descriptor
 
-    if domain not in BOOLEAN_SENSORS:
+    if BINARY_SENSOR not in descriptor.platforms:
         return None
 
-    return BinaryPhonieboxSensor(entry, domain, coordinator, None)
+    return BinaryPhonieboxSensor(entry, descriptor.name, coordinator, None)
 
 
 async def async_setup_entry(
@@ -62,38 +66,42 @@ async def async_setup_entry(
     """
     coordinator: DataCoordinator = hass.data[DOMAIN][config_entry.entry_id]
     LOGGER.debug("-----> Setup binary sensor")
+    # Topic -> binary sensor, resolved once on the first message of a topic
+    discovered: dict[str, BinaryPhonieboxSensor | None] = {}
+    add_entities = EntityAddBatcher(hass, async_add_devices)
 
     @callback
-    def received_msg(msg: ReceiveMessage) -> None:
+    def received_msg(msg: PhonieboxMessage) -> None:
+        if update_discovered_entity(discovered, msg.topic, hass, msg.value):
+            return
+
         LOGGER.debug("ReceiveMessage %(msg)s", {"msg": msg})
-        sensors = discover_sensors(msg.topic, config_entry, coordinator)
+        sensor = discover_sensors(msg, config_entry, coordinator)
         store = coordinator.sensors
+        discovered[msg.topic] = None
 
-        if not sensors:
+        if sensor is None or not isinstance(sensor.name, str):
             return
 
-        sensor_list = (
-            (sensors,) if isinstance(sensors, BinaryPhonieboxSensor) else sensors
+        context = create_mqtt_context(
+            entity=sensor,
+            store=store,
+            hass=hass,
+            msg_payload=msg.value,
+            async_add_entities_callback=add_entities,
         )
+        handle_mqtt_entity_by_type(
+            entity_type="binary_sensor",
+            context=context,
+            debug_logger=LOGGER,
+        )
+        # The store is shared by the sensor platforms
+        if isinstance(entity := store[sensor.name], BinaryPhonieboxSensor):
+            discovered[msg.topic] = entity
 
-        for sensor in sensor_list:
-            if not isinstance(sensor.name, str):
-                continue
-
-            context = create_mqtt_context(
-                entity=sensor,
-                store=store,
-                hass=hass,
-                msg_payload=msg.payload,
-                async_add_entities_callback=async_add_devices,
-            )
-            handle_mqtt_entity_by_type(
-                entity_type="binary_sensor",
-                context=context,
-                debug_logger=LOGGER,
-            )
-
-    await coordinator.mqtt_client.async_subscribe("#", received_msg)
+    coordinator.async_add_listener(
+        BINARY_SENSOR, keys_for_platform(BINARY_SENSOR), received_msg
+    )
 
 
 def _slug(name: str, phoniebox_name: str) -> str:
@@ -151,15 +159,15 @@ class BinaryPhonieboxSensor(PhonieboxEntity, BinarySensorEntity):
         self._attr_name = name
         self._attr_device_class = device_class
 
-    def set_event(self, event: Any) -> None:  # pylint: disable=unused-argument  # noqa: ARG002
+    def set_event(self, event: Any) -> bool:  # pylint: disable=unused-argument  # noqa: ARG002
         """
         Update the binary sensor with the most recent value.
 
         This method is a placeholder and currently does not implement any functionality.
         """
-        return
+        return False
 
-    def set_state(self, *, value: bool) -> None:
+    def set_state(self, *, value: bool) -> bool:
         """
         Update the binary sensor with the most recent value.
 
@@ -171,6 +179,10 @@ class BinaryPhonieboxSensor(PhonieboxEntity, BinarySensorEntity):
         ----
             value: The new boolean state to set for the binary sensor.
 
+        Returns:
+        -------
+            True if the state changed, False otherwise.
+
         Raises:
         ------
             ValueError: If the value is not a boolean.
@@ -180,9 +192,10 @@ class BinaryPhonieboxSensor(PhonieboxEntity, BinarySensorEntity):
 
         """
         if self._attr_is_on == value:
-            return
+            return False
         LOGGER.debug(
             "Updating binary sensor %(name)s to -> %(value)s",
             {"name": self.name, "value": value},
         )
         self._attr_is_on = value
+        return True
@@ -72,6 +72,7 @@ async def async_setup_entry(
     if len(buttons) == 0:
         return
 
+    new_buttons: list[PhonieboxButton] = []
     for button in buttons:
         if button.name not in store:
             button.hass = hass
@@ -80,7 +81,10 @@ async def async_setup_entry(
                 "Registering buttons %(name)s",
                 {"name": button.name},
             )
-            async_add_devices(new_entities=(button,), update_before_add=True)
+            new_buttons.append(button)
+
+    if new_buttons:
+        async_add_devices(new_entities=new_buttons)
 
 
 class PhonieboxButton(PhonieboxEntity, ButtonEntity, ABC):
@@ -109,6 +113,4 @@ class PhonieboxButton(PhonieboxEntity, ButtonEntity, ABC):
                 "Pressing button ------> %(topic)s",
                 {"topic": self._on_press_mqtt_topic},
             )
-            await self.mqtt_client.async_publish(
-                f"cmd/{self._on_press_mqtt_topic}", None
-            )
+            await self.mqtt_client.async_publish_cmd(self._on_press_mqtt_topic, None)
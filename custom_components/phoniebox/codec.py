@@ -0,0 +1,85 @@
+"""
+Payload codec of the Phoniebox integration.
+
+The phoniebox publishes every value as text. The coordinator decodes each
+payload exactly once at ingress with the decoder of the topic's descriptor
+and hands the typed value to every interested entity, so no entity parses
+or stringifies the raw payload on its own.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from .utils import bool_to_string, parse_float_save, parse_int_save, string_to_bool
+
+if TYPE_CHECKING:
+    from .descriptors import AttributeDescriptor
+
+# Max volume reported by a box that did not send a parseable value
+DEFAULT_MAX_VOLUME = 100
+
+
+def as_text(payload: Any) -> str:
+    """Return the payload as text, decoding raw bytes as UTF-8."""
+    if isinstance(payload, str):
+        return payload
+    if isinstance(payload, bool):
+        # JSON booleans of the bulk state
+        return bool_to_string(payload)
+    if isinstance(payload, bytes | bytearray):
+        return payload.decode("utf-8", errors="replace")
+    return str(payload)
+
+
+def decode_text(value: str) -> str:
+    """Decode a text payload."""
+    return value
+
+
+def decode_bool(value: str) -> bool:
+    """Decode a "true"/"false" payload."""
+    return string_to_bool(value)
+
+
+def decode_float(value: str) -> float:
+    """Decode a float payload, 0.0 if it cannot be parsed."""
+    return parse_float_save(value)
+
+
+def decode_int(value: str) -> int:
+    """Decode an int payload, 0 if it cannot be parsed."""
+    return parse_int_save(value)
+
+
+def decode_max_volume(value: str) -> int:
+    """Decode the max volume, which defaults to full volume."""
+    return parse_int_save(value, DEFAULT_MAX_VOLUME)
+
+
+def decode_seconds(value: str) -> int:
+    """Decode a HH:MM:SS duration into seconds."""
+    return sum(
+        x * parse_int_save(t)
+        for x, t in zip([3600, 60, 1], value.split(":"), strict=False)
+    )
+
+
+def decode_track(value: str) -> int:
+    """Decode the track number of a "<track>/<tracks>" payload."""
+    return parse_int_save(value.split(sep="/", maxsplit=1)[0])
+
+
+def decode_temperature(value: str) -> float:
+    """Decode a temperature like "45.6'C" into degrees, 0.0 if unparseable."""
+    return parse_float_save(value.partition("'")[0])
+
+
+def decode_source(value: str) -> str:
+    """Decode the source (e.g. "spotify") from a file uri."""
+    return value.partition(":")[0]
+
+
+def decode(descriptor: AttributeDescriptor, payload: Any) -> Any:
+    """Decode the raw payload of a topic into its typed value."""
+    return descriptor.parse(as_text(payload))
@@ -0,0 +1,419 @@
+"""
+Command queue of the Phoniebox integration.
+
+Commands of a box are published one at a time in the order they were sent.
+While a command is being published the following ones wait. Commands that
+only set a value (e.g. the volume while dragging the slider) are coalesced
+with a waiting command of the same kind, so the box only receives the latest
+value instead of every intermediate one. An optional token bucket limits the
+rate of commands a box receives, commands exceeding it are either delayed or
+rejected depending on their policy. While the box is offline commands wait in
+a bounded buffer instead and are published once it is back.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import LOGGER, RATE_LIMIT_REJECT
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterable, Mapping
+
+    from homeassistant.components.mqtt.models import PublishPayloadType
+    from homeassistant.core import HomeAssistant
+
+ERROR_RATE_LIMIT_EXCEEDED = "Rate limit exceeded, dropped command"
+
+
+@dataclass(slots=True)
+class QueuedCommand:
+    """
+    A command waiting to be published.
+
+    Attributes
+    ----------
+        command: The command topic below cmd/, e.g. "setvolume".
+        payload: The payload to publish.
+        enqueued: Loop time the oldest waiting caller sent the command.
+        waiters: Futures of the callers waiting for the publish.
+
+    """
+
+    command: str
+    payload: PublishPayloadType
+    enqueued: float
+    waiters: list[asyncio.Future[None]] = field(default_factory=list)
+
+
+class TokenBucket:
+    """
+    Token bucket allowing a burst of commands and a sustained rate after it.
+
+    Every command takes a token. The bucket holds up to burst tokens and is
+    refilled with rate tokens per second.
+    """
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float]) -> None:
+        """
+        Init a full bucket.
+
+        Args:
+        ----
+            rate: Tokens added per second
+            burst: The number of tokens the bucket holds
+            clock: Returns the current time in seconds
+
+        """
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last refill."""
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self) -> bool:
+        """Take a token, False if the bucket is empty."""
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def delay(self) -> float:
+        """Return the seconds until the next token is available."""
+        self._refill()
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+
+class OfflineBuffer:
+    """
+    Commands sent while the box is offline, in the order they were sent.
+
+    Every command expires after its time-to-live. A command replaces the
+    buffered one with the same coalesce key and moves to the end, so it still
+    runs after the commands sent before it. When the buffer is full the oldest
+    command is dropped.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float],
+        *,
+        max_size: int,
+        ttl: float,
+        ttls: Mapping[str, float] | None = None,
+        coalesce_keys: Mapping[str, str] | None = None,
+    ) -> None:
+        """
+        Init an empty buffer.
+
+        Args:
+        ----
+            clock: Returns the current time in seconds
+            max_size: The number of commands the buffer holds
+            ttl: Seconds a command is kept unless listed in ttls
+            ttls: Command -> seconds the command is kept, commands kept for 0
+                seconds are published right away
+            coalesce_keys: Command -> key of the buffered commands it replaces
+
+        """
+        self._clock = clock
+        self._ttl = ttl
+        self._ttls = dict(ttls or {})
+        self._coalesce_keys = dict(coalesce_keys or {})
+        # Buffered commands with the time they expire, oldest first
+        self._commands: deque[tuple[QueuedCommand, float]] = deque(maxlen=max_size)
+        self.buffered = 0
+        self.coalesced = 0
+        self.expired = 0
+        self.overflowed = 0
+        self.flushed = 0
+
+    def __len__(self) -> int:
+        """Return the number of buffered commands."""
+        return len(self._commands)
+
+    def put(self, command: str, payload: PublishPayloadType) -> bool:
+        """Buffer a command, False if it must not be buffered."""
+        ttl = self._ttls.get(command, self._ttl)
+        if ttl <= 0:
+            return False
+        now = self._clock()
+        self._drop_expired(now)
+        key = self._coalesce_keys.get(command)
+        if key is not None:
+            for index, (queued, _expires) in enumerate(self._commands):
+                if self._coalesce_keys.get(queued.command) == key:
+                    del self._commands[index]
+                    self.coalesced += 1
+                    break
+        if len(self._commands) == self._commands.maxlen:
+            self.overflowed += 1
+        self._commands.append(
+            (
+                QueuedCommand(command, payload, now),
+                now + ttl,
+            )
+        )
+        self.buffered += 1
+        return True
+
+    def take(self) -> list[QueuedCommand]:
+        """Remove and return the commands that did not expire, oldest first."""
+        self._drop_expired(self._clock())
+        commands = [queued for queued, _expires in self._commands]
+        self._commands.clear()
+        self.flushed += len(commands)
+        return commands
+
+    def clear(self) -> None:
+        """Drop all buffered commands."""
+        self._commands.clear()
+
+    def _drop_expired(self, now: float) -> None:
+        """Drop the commands whose time-to-live has passed."""
+        alive = [entry for entry in self._commands if entry[1] > now]
+        self.expired += len(self._commands) - len(alive)
+        self._commands = deque(alive, maxlen=self._commands.maxlen)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters of the buffer for the diagnostics."""
+        return {
+            "depth": len(self._commands),
+            "max_depth": self._commands.maxlen,
+            "buffered": self.buffered,
+            "coalesced": self.coalesced,
+            "expired": self.expired,
+            "overflowed": self.overflowed,
+            "flushed": self.flushed,
+        }
+
+
+class CommandQueue:
+    """Publish the commands of a box in order, coalescing repeated setters."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        publish: Callable[[str, PublishPayloadType], Awaitable[None]],
+        last_write_wins: Iterable[str] = (),
+        rate_limit_policies: Mapping[str, str] | None = None,
+        offline_buffer: OfflineBuffer | None = None,
+    ) -> None:
+        """
+        Init an empty queue.
+
+        Args:
+        ----
+            hass: Home Assistant instance
+            publish: Publishes the payload of a command
+            last_write_wins: Commands of which only the latest waiting payload
+                is published, all others are published one by one
+            rate_limit_policies: Command -> policy applied when the rate limit
+                is exceeded, commands not listed are delayed
+            offline_buffer: Holds the commands sent while the box is offline,
+                without it they are published regardless
+
+        """
+        self._hass = hass
+        self._publish = publish
+        self._last_write_wins = frozenset(last_write_wins)
+        self._rate_limit_policies = dict(rate_limit_policies or {})
+        self._bucket: TokenBucket | None = None
+        self.offline_buffer = offline_buffer
+        # Until the box reports otherwise it is assumed to be online
+        self.online = True
+        self._pending: deque[QueuedCommand] = deque()
+        self._in_flight: QueuedCommand | None = None
+        self._publisher: asyncio.Task[None] | None = None
+        self.published = 0
+        self.coalesced = 0
+        # Commands delayed and rejected by the rate limit
+        self.throttled = 0
+        self.rejected = 0
+        # Seconds from sending a command until it was published
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self._total_latency = 0.0
+
+    def __len__(self) -> int:
+        """Return the number of waiting commands."""
+        return len(self._pending)
+
+    @callback
+    def async_set_rate_limit(self, rate: float, burst: int) -> None:
+        """Limit the commands to rate per second after a burst, 0 disables it."""
+        self._bucket = (
+            TokenBucket(rate, burst, self._hass.loop.time) if rate > 0 else None
+        )
+
+    async def async_put(self, command: str, payload: PublishPayloadType) -> None:
+        """
+        Queue a command and wait until it was published.
+
+        If the command is last-write-wins and the last waiting command is of
+        the same kind, that one takes the payload instead of queueing another.
+        """
+        if (
+            not self.online
+            and self.offline_buffer is not None
+            and self.offline_buffer.put(command, payload)
+        ):
+            # The caller does not wait for the box to come back
+            return
+
+        future: asyncio.Future[None] = self._hass.loop.create_future()
+        if (
+            command in self._last_write_wins
+            and self._pending
+            and self._pending[-1].command == command
+        ):
+            # Only the last command is replaced, an earlier one would be
+            # published before the commands sent in between
+            queued = self._pending[-1]
+            queued.payload = payload
+            queued.waiters.append(future)
+            self.coalesced += 1
+        else:
+            self._async_append(command, payload, future)
+
+        self._async_start_publisher()
+        await future
+
+    @callback
+    def async_set_online(self, online: bool) -> None:  # noqa: FBT001
+        """Track the availability of the box, flushing the buffer once back."""
+        was_online, self.online = self.online, online
+        if not online or was_online or self.offline_buffer is None:
+            return
+        flushed = self.offline_buffer.take()
+        if not flushed:
+            return
+        LOGGER.debug(
+            "Box is back online, publishing %(count)d buffered commands",
+            {"count": len(flushed)},
+        )
+        now = self._hass.loop.time()
+        for queued in flushed:
+            # The queue latency starts now, the time offline is not its doing
+            queued.enqueued = now
+            self._pending.append(queued)
+        self._async_start_publisher()
+
+    @callback
+    def _async_start_publisher(self) -> None:
+        """Start publishing the waiting commands unless already publishing."""
+        if self._publisher is None:
+            publisher = self._hass.async_create_task(self._async_publish_pending())
+            # An eager start may have published everything already
+            if not publisher.done():
+                self._publisher = publisher
+
+    @callback
+    def _async_append(
+        self, command: str, payload: PublishPayloadType, future: asyncio.Future[None]
+    ) -> None:
+        """Add a command to the end of the queue."""
+        self._pending.append(
+            QueuedCommand(command, payload, self._hass.loop.time(), [future])
+        )
+
+    async def _async_publish_pending(self) -> None:
+        """Publish the waiting commands one at a time."""
+        try:
+            while self._pending:
+                if self._bucket is not None and not self._bucket.try_take():
+                    # The first command waits in the queue, so setters sent in
+                    # the meantime are still coalesced with it
+                    queued = self._pending[0]
+                    if (
+                        self._rate_limit_policies.get(queued.command)
+                        == RATE_LIMIT_REJECT
+                    ):
+                        self._async_reject(self._pending.popleft())
+                        continue
+                    self.throttled += 1
+                    await asyncio.sleep(self._bucket.delay())
+                    continue
+                queued = self._in_flight = self._pending.popleft()
+                try:
+                    await self._publish(queued.command, queued.payload)
+                except Exception as err:  # noqa: BLE001
+                    for waiter in queued.waiters:
+                        if not waiter.done():
+                            waiter.set_exception(err)
+                    continue
+                finally:
+                    self._in_flight = None
+                self._async_record_latency(self._hass.loop.time() - queued.enqueued)
+                for waiter in queued.waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+        finally:
+            self._publisher = None
+
+    @callback
+    def _async_reject(self, queued: QueuedCommand) -> None:
+        """Drop a command exceeding the rate limit, failing its callers."""
+        LOGGER.debug(
+            "Rate limit exceeded, dropping %(command)s", {"command": queued.command}
+        )
+        self.throttled += 1
+        self.rejected += 1
+        for waiter in queued.waiters:
+            if not waiter.done():
+                waiter.set_exception(
+                    HomeAssistantError(f"{ERROR_RATE_LIMIT_EXCEEDED} {queued.command}")
+                )
+
+    @callback
+    def _async_record_latency(self, latency: float) -> None:
+        """Count a published command and the time it took."""
+        self.published += 1
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self._total_latency += latency
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop the waiting commands, e.g. when the config entry is unloaded."""
+        if self._publisher is not None:
+            self._publisher.cancel()
+            self._publisher = None
+        if self._in_flight is not None:
+            self._pending.appendleft(self._in_flight)
+            self._in_flight = None
+        for queued in self._pending:
+            for waiter in queued.waiters:
+                waiter.cancel()
+        self._pending.clear()
+        if self.offline_buffer is not None:
+            self.offline_buffer.clear()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters of the queue for the diagnostics."""
+        return {
+            "online": self.online,
+            "depth": len(self._pending),
+            "published": self.published,
+            "coalesced": self.coalesced,
+            "throttled": self.throttled,
+            "rejected": self.rejected,
+            "last_latency": self.last_latency,
+            "mean_latency": (
+                self._total_latency / self.published if self.published else 0.0
+            ),
+            "max_latency": self.max_latency,
+        }
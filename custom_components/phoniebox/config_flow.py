@@ -5,8 +5,34 @@ from typing import Any, override
 
 import voluptuous as vol
 from homeassistant import config_entries
+from homeassistant.core import callback
 
-from .const import CONF_MQTT_BASE_TOPIC, CONF_PHONIEBOX_NAME, DOMAIN
+from .const import (
+    CONF_COMMAND_BURST,
+    CONF_COMMAND_RATE,
+    CONF_INGESTION_MODE,
+    CONF_MQTT_BASE_TOPIC,
+    CONF_OPTIMISTIC,
+    CONF_PHONIEBOX_NAME,
+    CONF_POSITION_DRIFT_THRESHOLD,
+    DEFAULT_COMMAND_BURST,
+    DEFAULT_COMMAND_RATE,
+    DEFAULT_INGESTION_MODE,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DEFAULT_OPTIMISTIC,
+    DEFAULT_POSITION_DRIFT_THRESHOLD,
+    DOMAIN,
+    INGESTION_MODES,
+    PLATFORMS,
+)
+from .descriptors import (
+    UPDATE_INTERVAL_ATTRIBUTES,
+    UPDATE_INTERVAL_CATEGORIES,
+    update_interval_option,
+)
+
+# Seconds, a day at most
+_UPDATE_INTERVAL = vol.All(vol.Coerce(int), vol.Range(min=0, max=86400))
 
 
 class BlueprintFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
@@ -20,6 +46,14 @@ class BlueprintFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         """Initialize."""
         self._errors = {}
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,  # noqa: ARG004
+    ) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return PhonieboxOptionsFlowHandler()
+
     @override
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -59,3 +93,69 @@ class BlueprintFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             ),
             errors=self._errors,
         )
+
+
+class PhonieboxOptionsFlowHandler(config_entries.OptionsFlow):
+    """Options flow of a phoniebox: platforms and update intervals."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Manage the options."""
+        return await self.async_step_user(user_input)
+
+    async def async_step_user(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Show and store the options of the phoniebox."""
+        if user_input is not None:
+            return self.async_create_entry(
+                title=self.config_entry.title, data=user_input
+            )
+
+        options = self.config_entry.options
+        schema: dict[Any, Any] = {
+            vol.Required(str(platform), default=options.get(platform, True)): bool
+            for platform in PLATFORMS
+        }
+        schema[
+            vol.Required(
+                CONF_POSITION_DRIFT_THRESHOLD,
+                default=options.get(
+                    CONF_POSITION_DRIFT_THRESHOLD, DEFAULT_POSITION_DRIFT_THRESHOLD
+                ),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=0))
+        schema[
+            vol.Required(
+                CONF_OPTIMISTIC,
+                default=options.get(CONF_OPTIMISTIC, DEFAULT_OPTIMISTIC),
+            )
+        ] = bool
+        schema[
+            vol.Required(
+                CONF_INGESTION_MODE,
+                default=options.get(CONF_INGESTION_MODE, DEFAULT_INGESTION_MODE),
+            )
+        ] = vol.In(INGESTION_MODES)
+        schema[
+            vol.Required(
+                CONF_COMMAND_RATE,
+                default=options.get(CONF_COMMAND_RATE, DEFAULT_COMMAND_RATE),
+            )
+        ] = vol.All(vol.Coerce(float), vol.Range(min=0))
+        schema[
+            vol.Required(
+                CONF_COMMAND_BURST,
+                default=options.get(CONF_COMMAND_BURST, DEFAULT_COMMAND_BURST),
+            )
+        ] = vol.All(vol.Coerce(int), vol.Range(min=1))
+        # A category applies to all of its attributes, an attribute interval
+        # of 0 falls back to its category
+        for name in (*UPDATE_INTERVAL_CATEGORIES, *UPDATE_INTERVAL_ATTRIBUTES):
+            key = update_interval_option(name)
+            schema[
+                vol.Required(key, default=options.get(key, DEFAULT_MIN_UPDATE_INTERVAL))
+            ] = _UPDATE_INTERVAL
+
+        return self.async_show_form(step_id="user", data_schema=vol.Schema(schema))
@@ -140,9 +140,42 @@ CONF_USERNAME: Final[str] = "username"
 
 CONF_PHONIEBOX_NAME: Final[str] = "phoniebox_name"
 CONF_MQTT_BASE_TOPIC: Final[str] = "mqtt_base_topic"
+CONF_POSITION_DRIFT_THRESHOLD: Final[str] = "position_drift_threshold"
+# Whether the media player shows the expected state before the box confirms it
+CONF_OPTIMISTIC: Final[str] = "optimistic"
+# Prefix of the options holding a minimum update interval in seconds, followed
+# by a category (e.g. "diagnostic") or an attribute (e.g. "temperature")
+CONF_MIN_UPDATE_INTERVAL: Final[str] = "min_update_interval"
+# Commands per second a box accepts on average and in a burst, 0 disables
+# the rate limit
+CONF_COMMAND_RATE: Final[str] = "command_rate"
+CONF_COMMAND_BURST: Final[str] = "command_burst"
+# How the attributes of the box are received
+CONF_INGESTION_MODE: Final[str] = "ingestion_mode"
+# One topic per attribute, switching to bulk once the box publishes it
+INGESTION_MODE_AUTO: Final[str] = "auto"
+# One topic per attribute
+INGESTION_MODE_TOPICS: Final[str] = "topics"
+# A single JSON topic holding the map of all attributes
+INGESTION_MODE_BULK: Final[str] = "bulk"
+INGESTION_MODES: Final[list[str]] = [
+    INGESTION_MODE_AUTO,
+    INGESTION_MODE_TOPICS,
+    INGESTION_MODE_BULK,
+]
 
 # Defaults
 DEFAULT_NAME: Final[str] = DOMAIN
+# Seconds the reported elapsed time may deviate from the interpolated media
+# position before the media player writes a new state
+DEFAULT_POSITION_DRIFT_THRESHOLD: Final[int] = 2
+# Seconds between two updates of an attribute, 0 updates on every message
+DEFAULT_MIN_UPDATE_INTERVAL: Final[int] = 0
+DEFAULT_INGESTION_MODE: Final[str] = INGESTION_MODE_AUTO
+DEFAULT_OPTIMISTIC: Final[bool] = False
+# Commands per second after a burst, 0 disables the rate limit
+DEFAULT_COMMAND_RATE: Final[float] = 0.0
+DEFAULT_COMMAND_BURST: Final[int] = 10
 
 # ===== PHONIEBOX ATTRIBUTES =====
 # Phoniebox device and state attributes
@@ -256,59 +289,94 @@ PHONIEBOX_CMD_SWIPE_CARD: Final[str] = "swipecard"
 # Utility commands
 PHONIEBOX_CMD_SCAN: Final[str] = "scan"
 
-# ===== SENSOR CATEGORIZATION =====
-# Binary switches that can be toggled
-BINARY_SWITCHES: Final[list[str]] = [
-    PHONIEBOX_ATTR_GPIO,
-    PHONIEBOX_ATTR_RFID,
-    PHONIEBOX_ATTR_MUTE,
-]
-
-# Boolean sensor attributes
-BOOLEAN_SENSORS: Final[list[str]] = [
-    PHONIEBOX_ATTR_GPIO,
-    PHONIEBOX_ATTR_RFID,
-    PHONIEBOX_ATTR_REPEAT,
-    PHONIEBOX_ATTR_RANDOM,
-    PHONIEBOX_ATTR_MUTE,
-]
+# Commands setting a value, of which only the latest waiting payload is
+# published. All other commands are published one by one in order.
+COMMANDS_LAST_WRITE_WINS: Final[frozenset[str]] = frozenset(
+    {
+        PHONIEBOX_CMD_SET_VOLUME,
+        PHONIEBOX_CMD_SET_MAX_VOLUME,
+        PHONIEBOX_CMD_PLAYER_SEEK,
+    }
+)
 
-# String sensor attributes
-STRING_SENSORS: Final[list[str]] = [
-    PHONIEBOX_ATTR_THROTTLING,
-    PHONIEBOX_ATTR_VERSION,
-    PHONIEBOX_ATTR_LAST_CARD,
-    PHONIEBOX_ATTR_ALBUM,
-    PHONIEBOX_ATTR_ARTIST,
-    PHONIEBOX_ATTR_ALBUM_ARTIST,
-    PHONIEBOX_ATTR_EDITION,
-]
+# What happens to a command exceeding the rate limit of the box
+# Wait until the box accepts commands again
+RATE_LIMIT_DELAY: Final[str] = "delay"
+# Drop the command
+RATE_LIMIT_REJECT: Final[str] = "reject"
+# Rate limit policy per command class, commands not listed are delayed. A
+# burst of relative steps is dropped instead of replayed step by step later.
+COMMAND_RATE_LIMIT_POLICIES: Final[dict[str, str]] = {
+    PHONIEBOX_CMD_VOLUME_UP: RATE_LIMIT_REJECT,
+    PHONIEBOX_CMD_VOLUME_DOWN: RATE_LIMIT_REJECT,
+}
 
-# Numeric sensor attributes
-NUMBER_SENSORS: Final[list[str]] = [
-    PHONIEBOX_ATTR_REMAINING_STOP_AFTER,
-    PHONIEBOX_ATTR_REMAINING_SHUTDOWN_AFTER,
-    PHONIEBOX_ATTR_REMAINING_IDLE,
-    PHONIEBOX_ATTR_VOLUME_STEPS,
-    PHONIEBOX_ATTR_MAX_VOLUME,
-    PHONIEBOX_ATTR_IDLE_TIME,
-]
+# Commands sent while the box is offline wait in a buffer until it is back
+OFFLINE_BUFFER_SIZE: Final[int] = 32
+# Seconds a buffered command is still worth publishing
+OFFLINE_BUFFER_TTL: Final[float] = 300.0
+# Commands that must never run late, they are published right away
+COMMANDS_NEVER_BUFFERED: Final[frozenset[str]] = frozenset(
+    {
+        PHONIEBOX_CMD_SHUTDOWN,
+        PHONIEBOX_CMD_SHUTDOWN_AFTER,
+        PHONIEBOX_CMD_SHUTDOWN_SILENT,
+        PHONIEBOX_CMD_REBOOT,
+        PHONIEBOX_CMD_DISABLE_WIFI,
+    }
+)
+# Playback started minutes late would surprise whoever is near the box, a
+# time-to-live of 0 publishes the command right away
+OFFLINE_BUFFER_TTLS: Final[dict[str, float]] = {
+    **dict.fromkeys(COMMANDS_NEVER_BUFFERED, 0.0),
+    PHONIEBOX_CMD_PLAYER_PLAY: 30.0,
+    PHONIEBOX_CMD_PLAYER_PAUSE: 30.0,
+    PHONIEBOX_CMD_PLAYER_STOP: 30.0,
+    PHONIEBOX_CMD_PLAYER_NEXT: 30.0,
+    PHONIEBOX_CMD_PLAYER_PREV: 30.0,
+    PHONIEBOX_CMD_PLAYER_SEEK: 30.0,
+    PHONIEBOX_CMD_PLAY_FOLDER: 30.0,
+    PHONIEBOX_CMD_PLAY_FOLDER_RECURSIVE: 30.0,
+    PHONIEBOX_CMD_SWIPE_CARD: 30.0,
+}
+# Command -> key of the buffered commands it replaces, only the latest
+# command of a key is published once the box is back
+OFFLINE_BUFFER_COALESCE_KEYS: Final[dict[str, str]] = {
+    **{command: command for command in COMMANDS_LAST_WRITE_WINS},
+    PHONIEBOX_CMD_PLAYER_PLAY: PHONIEBOX_ATTR_STATE,
+    PHONIEBOX_CMD_PLAYER_PAUSE: PHONIEBOX_ATTR_STATE,
+    PHONIEBOX_CMD_PLAYER_STOP: PHONIEBOX_ATTR_STATE,
+}
 
-# Disk usage sensors (in gigabytes)
-GIGABYTE_SENSORS: Final[list[str]] = [
-    PHONIEBOX_ATTR_DISK_AVAILABLE,
-    PHONIEBOX_ATTR_DISK_TOTAL,
-]
+# Command -> attribute the box reports once it acted on the command, used to
+# measure the round trip of commands
+COMMAND_ATTRIBUTES: Final[dict[str, str]] = {
+    PHONIEBOX_CMD_SET_VOLUME: PHONIEBOX_ATTR_VOLUME,
+    PHONIEBOX_CMD_VOLUME_UP: PHONIEBOX_ATTR_VOLUME,
+    PHONIEBOX_CMD_VOLUME_DOWN: PHONIEBOX_ATTR_VOLUME,
+    PHONIEBOX_CMD_SET_MAX_VOLUME: PHONIEBOX_ATTR_MAX_VOLUME,
+    PHONIEBOX_CMD_SET_VOLUME_STEPS: PHONIEBOX_ATTR_VOLUME_STEPS,
+    PHONIEBOX_CMD_MUTE: PHONIEBOX_ATTR_MUTE,
+    PHONIEBOX_CMD_PLAYER_PLAY: PHONIEBOX_ATTR_STATE,
+    PHONIEBOX_CMD_PLAYER_PAUSE: PHONIEBOX_ATTR_STATE,
+    PHONIEBOX_CMD_PLAYER_STOP: PHONIEBOX_ATTR_STATE,
+    PHONIEBOX_CMD_PLAYER_NEXT: PHONIEBOX_ATTR_TRACK,
+    PHONIEBOX_CMD_PLAYER_PREV: PHONIEBOX_ATTR_TRACK,
+    PHONIEBOX_CMD_PLAYER_SEEK: PHONIEBOX_ATTR_ELAPSED,
+    PHONIEBOX_CMD_PLAYER_SHUFFLE: PHONIEBOX_ATTR_RANDOM,
+    PHONIEBOX_CMD_PLAYER_REPEAT: PHONIEBOX_ATTR_REPEAT,
+    PHONIEBOX_CMD_SET_GPIO: PHONIEBOX_ATTR_GPIO,
+    PHONIEBOX_CMD_SET_RFID: PHONIEBOX_ATTR_RFID,
+}
+# Seconds after which a command the box did not act on is no longer matched
+ROUND_TRIP_TIMEOUT: Final[float] = 10.0
+# Number of most recent round trips the latency percentiles are taken from
+ROUND_TRIP_WINDOW: Final[int] = 256
+# Round trip percentiles exposed as diagnostic sensors
+COMMAND_LATENCY_PERCENTILES: Final[tuple[int, ...]] = (50, 95, 99)
 
-# Sensors to ignore (handled elsewhere, like media player)
-IGNORE_SENSORS: Final[list[str]] = [
-    PHONIEBOX_ATTR_TITLE,
-    PHONIEBOX_ATTR_TRACK,
-    PHONIEBOX_ATTR_TRACK_DATE,
-    PHONIEBOX_ATTR_ELAPSED,
-    PHONIEBOX_ATTR_DURATION,
-    PHONIEBOX_ATTR_VOLUME,
-]
+# ===== SENSOR CATEGORIZATION =====
+# Which topics create which entities is described in descriptors.py
 
 # ===== BUTTONS =====
 # Button entity names
@@ -332,10 +400,6 @@ ALL_BUTTONS: Final[list[str]] = [
 ]
 
 # ===== MQTT TOPIC CONFIGURATION =====
-# Topic length constants for parsing
-TOPIC_LENGTH_PLAYER_STATE: Final[int] = 3
-TOPIC_LENGTH_GENERIC_STATE: Final[int] = 2
-
 # Topic domain constants
 TOPIC_DOMAIN_STATE: Final[str] = "state"
 # noinspection SpellCheckingInspection
@@ -344,6 +408,46 @@ TOPIC_DOMAIN_FILE: Final[str] = "file"
 TOPIC_DOMAIN_VERSION: Final[str] = "version"
 TOPIC_DOMAIN_RANDOM: Final[str] = "random"
 
+# Metadata the box publishes one message at a time when the track changes
+TRACK_METADATA_ATTRIBUTES: Final[frozenset[str]] = frozenset(
+    {
+        PHONIEBOX_ATTR_TITLE,
+        PHONIEBOX_ATTR_ARTIST,
+        PHONIEBOX_ATTR_ALBUM,
+        PHONIEBOX_ATTR_ALBUM_ARTIST,
+        PHONIEBOX_ATTR_TRACK,
+        PHONIEBOX_ATTR_DURATION,
+        TOPIC_DOMAIN_FILE,
+    }
+)
+# Metadata starting a track change
+TRACK_CHANGE_ATTRIBUTES: Final[frozenset[str]] = frozenset(
+    {TOPIC_DOMAIN_FILE, PHONIEBOX_ATTR_TRACK}
+)
+# Metadata completing a track change, it differs from track to track. The rest
+# may never arrive, the box does not resend unchanged values (e.g. the album of
+# the next track of an album) and not every box knows the album artist.
+TRACK_CHANGE_COMPLETE_ATTRIBUTES: Final[frozenset[str]] = frozenset(
+    {
+        TOPIC_DOMAIN_FILE,
+        PHONIEBOX_ATTR_TITLE,
+        PHONIEBOX_ATTR_TRACK,
+        PHONIEBOX_ATTR_DURATION,
+    }
+)
+# Seconds to wait for the metadata completing a track change before the
+# metadata received so far is written
+TRACK_CHANGE_TIMEOUT: Final[float] = 0.5
+# Seconds the box has to confirm an optimistic change before it is rolled back
+OPTIMISTIC_TIMEOUT: Final[float] = 3.0
+
+# Seconds a loop iteration may spend ingesting messages, the rest waits in the
+# ingress queue and is ingested in chunks of the same budget
+INGRESS_CHUNK_BUDGET: Final[float] = 0.01
+# Messages waiting in the ingress queue before the least important are dropped,
+# well above the number of topics one box publishes
+INGRESS_QUEUE_SIZE: Final[int] = 256
+
 # ===== COMMAND MAPPINGS =====
 # Mapping from button names to MQTT commands
 NAME_TO_MQTT_COMMAND: Final[dict[str, str]] = {
@@ -356,16 +460,6 @@ NAME_TO_MQTT_COMMAND: Final[dict[str, str]] = {
     BUTTON_SHUTDOWN_SILENT: PHONIEBOX_CMD_SHUTDOWN_SILENT,
 }
 
-# ===== FINAL SENSOR LISTS =====
-# Diagnostic sensors (for device diagnostics) - defined after all dependencies
-DIAGNOSTIC_SENSORS: Final[list[str]] = [
-    PHONIEBOX_ATTR_THROTTLING,
-    PHONIEBOX_ATTR_VERSION,
-    PHONIEBOX_ATTR_EDITION,
-    TOPIC_DOMAIN_TEMPERATUR,
-    *GIGABYTE_SENSORS,
-]
-
 # ===== CONSTANTS SUMMARY =====
 """
 This module organizes constants into logical groups for better maintainability:
@@ -377,7 +471,7 @@ This module organizes constants into logical groups for better maintainability:
 5. CONFIGURATION: Config flow and options constants
 6. PHONIEBOX ATTRIBUTES: All MQTT attributes from Phoniebox
 7. PHONIEBOX COMMANDS: All MQTT commands to control Phoniebox
-8. SENSOR CATEGORIZATION: Organized sensor types for entity creation
+8. SENSOR CATEGORIZATION: Pointer to the attribute descriptors
 9. BUTTONS: Button entity definitions
 10. MQTT TOPIC CONFIGURATION: Topic parsing and structure
 11. COMMAND MAPPINGS: Button to command translations
@@ -2,9 +2,45 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import asyncio
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .codec import decode
+from .const import (
+    INGESTION_MODE_AUTO,
+    INGESTION_MODE_BULK,
+    INGESTION_MODE_TOPICS,
+    INGRESS_CHUNK_BUDGET,
+    INGRESS_QUEUE_SIZE,
+    LOGGER,
+    PHONIEBOX_STATE_OFFLINE,
+    TOPIC_DOMAIN_STATE,
+)
+from .descriptors import (
+    ATTRIBUTE_DESCRIPTORS,
+    ATTRIBUTE_TOPIC_PREFIX,
+    BULK_STATE_TOPIC,
+    COMMAND_TOPIC_PREFIX,
+    AttributeDescriptor,
+    topic_filters,
+)
+from .ingress import IngressQueue
+from .utils import StateFlushScheduler
 
 if TYPE_CHECKING:
+    from asyncio import Handle
+    from collections.abc import Iterable
+    from datetime import datetime
+
+    from homeassistant.components.mqtt.models import ReceiveMessage
+
     from custom_components.phoniebox.button import PhonieboxButton
     from custom_components.phoniebox.sensor import GenericPhonieboxSensor
     from custom_components.phoniebox.switch import PhonieboxBinarySwitch
@@ -13,12 +49,42 @@ if TYPE_CHECKING:
     from .mqtt_client import MqttClient
 
 
+@dataclass(frozen=True, slots=True)
+class PhonieboxMessage:
+    """
+    A message received from the phoniebox, decoded once at ingress.
+
+    Attributes
+    ----------
+        topic: The full MQTT topic the message was received on.
+        descriptor: The description of the topic.
+        payload: The raw MQTT payload.
+        value: The payload decoded by the codec of the descriptor.
+
+    """
+
+    topic: str
+    descriptor: AttributeDescriptor
+    payload: Any
+    value: Any
+
+    @property
+    def attribute(self) -> str:
+        """The phoniebox attribute (or domain) the message is about."""
+        return self.descriptor.attribute
+
+
+MessageHandler = Callable[[PhonieboxMessage], None]
+
+
 class DataCoordinator:  # pylint: disable=too-few-public-methods
     """
     Class to manage data of the integration.
 
     This coordinator centralizes data management for the Phoniebox integration,
-    maintaining references to all entities and the MQTT client.
+    maintaining references to all entities and the MQTT client. It also owns the
+    MQTT subscriptions of a config entry and routes each message to the
+    platform handlers interested in its attribute.
     """
 
     def __init__(self, mqtt_client: MqttClient) -> None:
@@ -41,3 +107,384 @@ class DataCoordinator:  # pylint: disable=too-few-public-methods
 
         # Version information
         self.version = "unknown"
+
+        # State writes skipped because a payload did not change an entity
+        self.suppressed_writes = 0
+        # Optimistic changes the box confirmed, corrected or never reported
+        self.optimistic_confirmed = 0
+        self.optimistic_corrected = 0
+        self.optimistic_rolled_back = 0
+        # Writes the state of changed entities once per loop iteration
+        self.state_flush = StateFlushScheduler(mqtt_client.hass)
+
+        # Descriptor key -> handlers interested in it
+        self._listeners: dict[str, list[MessageHandler]] = {}
+        # Platform -> callables removing the handlers it registered
+        self._platform_listeners: dict[str, list[CALLBACK_TYPE]] = {}
+        self._prefix_length = len(mqtt_client.base_topic) + 1
+        self._attribute_prefix = f"{mqtt_client.base_topic}/{ATTRIBUTE_TOPIC_PREFIX}"
+        # Commands published by this integration, echoed back by the broker
+        self._command_prefix = f"{mqtt_client.base_topic}/{COMMAND_TOPIC_PREFIX}"
+        self.command_echoes = 0
+        # Topic filter -> callable releasing its subscription
+        self._subscriptions: dict[str, CALLBACK_TYPE] = {}
+        # Configured ingestion mode and whether the box publishes bulk state
+        self.ingestion_mode = INGESTION_MODE_AUTO
+        self._bulk_detected = False
+        self._bulk_topic = f"{mqtt_client.base_topic}/{BULK_STATE_TOPIC}"
+        self.bulk_messages = 0
+
+        # Messages waiting while a burst exceeds what one loop iteration may
+        # ingest, and the task ingesting them in chunks
+        self.ingress = IngressQueue(INGRESS_QUEUE_SIZE)
+        self._ingress_task: asyncio.Task[None] | None = None
+        # Loop time of the first message ingested right away in this iteration
+        self._chunk_started: float | None = None
+        self._chunk_reset: Handle | None = None
+
+        # Topic -> last decoded message, to drop republished identical payloads
+        # and to replay known values to late listeners without decoding again
+        self._last_messages: dict[str, PhonieboxMessage] = {}
+        self._deduplication_exempt_topics = frozenset(
+            f"{mqtt_client.base_topic}/{key}"
+            for key, descriptor in ATTRIBUTE_DESCRIPTORS.items()
+            if not descriptor.deduplicate
+        )
+        self.duplicate_hits = 0
+        self.duplicate_misses = 0
+
+        # Descriptor key -> minimum seconds between two dispatches of a topic
+        self._update_intervals: dict[str, float] = {}
+        # Topic -> time of its last dispatch
+        self._last_dispatched: dict[str, datetime] = {}
+        # Topic -> cancels the trailing dispatch of its latest message
+        self._trailing_dispatches: dict[str, CALLBACK_TYPE] = {}
+        self.throttled_messages = 0
+
+    def _attribute_topic(self, attribute: str) -> str:
+        """Return the full topic of a phoniebox attribute."""
+        return f"{self.mqtt_client.base_topic}/{ATTRIBUTE_TOPIC_PREFIX}{attribute}"
+
+    @callback
+    def async_add_listener(
+        self, platform: str, keys: Iterable[str], handler: MessageHandler
+    ) -> CALLBACK_TYPE:
+        """
+        Register a handler for messages of the given descriptor keys.
+
+        Handlers registered after messages were received (e.g. a platform that
+        got enabled later on) are immediately fed the last known payloads.
+
+        Args:
+        ----
+            platform: The platform registering the handler
+            keys: The descriptor keys (topics below the base topic) it cares about
+            handler: Callback invoked with the parsed message
+
+        Returns:
+        -------
+            A callable that removes the handler again
+
+        """
+        keys = tuple(dict.fromkeys(keys))
+        for key in keys:
+            self._listeners.setdefault(key, []).append(handler)
+
+        @callback
+        def remove_listener() -> None:
+            for key in keys:
+                handlers = self._listeners.get(key)
+                if handlers and handler in handlers:
+                    handlers.remove(handler)
+                if not handlers:
+                    self._listeners.pop(key, None)
+
+        self._platform_listeners.setdefault(platform, []).append(remove_listener)
+
+        for message in tuple(self._last_messages.values()):
+            if message.descriptor.key in keys:
+                handler(message)
+
+        return remove_listener
+
+    @callback
+    def async_release_platform(self, platform: str) -> None:
+        """Remove the handlers and stored entities of an unloaded platform."""
+        for remove_listener in self._platform_listeners.pop(platform, []):
+            remove_listener()
+
+        prefix = f"{platform}."
+        for store in (self.sensors, self.switches, self.buttons):
+            for name, entity in tuple(store.items()):
+                if entity.entity_id.startswith(prefix):
+                    del store[name]
+
+    async def async_subscribe(self) -> None:
+        """
+        Subscribe to the topics consumed by the enabled platforms.
+
+        Called again after the platforms changed, only the difference is
+        subscribed or released.
+        """
+        filters = self._topic_filters()
+        for topic in tuple(self._subscriptions):
+            if topic not in filters:
+                self._subscriptions.pop(topic)()
+        for topic in filters:
+            if topic not in self._subscriptions:
+                self._subscriptions[topic] = await self.mqtt_client.async_subscribe(
+                    topic,
+                    self.async_route_bulk_message
+                    if topic == BULK_STATE_TOPIC
+                    else self.async_route_message,
+                )
+
+    @property
+    def uses_bulk_state(self) -> bool:
+        """Return True if the attributes are received through the bulk topic."""
+        return self.ingestion_mode == INGESTION_MODE_BULK or (
+            self.ingestion_mode == INGESTION_MODE_AUTO and self._bulk_detected
+        )
+
+    def _topic_filters(self) -> tuple[str, ...]:
+        """Return the topic filters of the enabled platforms and ingestion mode."""
+        if self.uses_bulk_state:
+            return topic_filters(self.platforms, bulk=True)
+        filters = topic_filters(self.platforms)
+        if self.ingestion_mode == INGESTION_MODE_TOPICS or not filters:
+            return filters
+        # Listen for bulk state until the box is known to publish it
+        return (*filters, BULK_STATE_TOPIC)
+
+    @callback
+    def async_set_ingestion_mode(self, mode: str) -> None:
+        """Set the configured ingestion mode, applied by async_subscribe."""
+        self.ingestion_mode = mode
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Release all MQTT subscriptions and message handlers."""
+        self.mqtt_client.async_unsubscribe_all()
+        self.mqtt_client.commands.async_cancel()
+        self._subscriptions.clear()
+        self.state_flush.async_cancel()
+        if self._ingress_task is not None:
+            self._ingress_task.cancel()
+            self._ingress_task = None
+        if self._chunk_reset is not None:
+            self._chunk_reset.cancel()
+            self._chunk_reset = None
+        self.ingress.clear()
+        for cancel in self._trailing_dispatches.values():
+            cancel()
+        self._trailing_dispatches.clear()
+        self._listeners.clear()
+        self._platform_listeners.clear()
+
+    @callback
+    def async_forget_payload(self, attribute: str) -> None:
+        """
+        Forget the last payload of an attribute.
+
+        Used after optimistic updates, so the next report of the box is applied
+        even if it repeats the previous payload.
+        """
+        self._last_messages.pop(self._attribute_topic(attribute), None)
+
+    @callback
+    def async_route_message(self, msg: ReceiveMessage) -> None:
+        """Classify and decode the message once and dispatch it."""
+        topic = msg.topic
+        if topic.startswith(self._command_prefix):
+            self.command_echoes += 1
+            return
+
+        descriptor = ATTRIBUTE_DESCRIPTORS.get(topic[self._prefix_length :])
+        if descriptor is None:
+            # Unknown attributes and topics nobody consumes
+            return
+
+        self._async_enqueue(topic, descriptor, msg.payload)
+
+    @callback
+    def async_route_bulk_message(self, msg: ReceiveMessage) -> None:
+        """
+        Decode the JSON attribute map once and ingest each attribute.
+
+        Every attribute takes the same path as if it was received on its own
+        topic, so deduplication, update intervals and handlers apply as usual.
+        """
+        try:
+            attributes = json.loads(msg.payload)
+        except ValueError:
+            LOGGER.warning("Ignoring invalid bulk state on %s", msg.topic)
+            return
+        if not isinstance(attributes, dict):
+            LOGGER.warning("Ignoring bulk state without attributes on %s", msg.topic)
+            return
+
+        self.bulk_messages += 1
+        if self.ingestion_mode == INGESTION_MODE_AUTO and not self._bulk_detected:
+            LOGGER.info("%s publishes bulk state, switching to it", msg.topic)
+            self._bulk_detected = True
+            self.mqtt_client.hass.async_create_task(self.async_subscribe())
+
+        for attribute, payload in attributes.items():
+            key = f"{ATTRIBUTE_TOPIC_PREFIX}{attribute}"
+            descriptor = ATTRIBUTE_DESCRIPTORS.get(key)
+            if descriptor is not None:
+                self._async_enqueue(
+                    self._attribute_topic(attribute), descriptor, payload
+                )
+
+    @callback
+    def _async_enqueue(
+        self, topic: str, descriptor: AttributeDescriptor, payload: Any
+    ) -> None:
+        """
+        Ingest the payload right away, or queue it if the loop is behind.
+
+        Once a message waits, all following ones wait too, so a topic never
+        gets an older payload after a newer one.
+        """
+        if self._ingress_task is None:
+            loop = self.mqtt_client.hass.loop
+            if self._chunk_started is None:
+                self._chunk_started = loop.time()
+                self._chunk_reset = loop.call_soon(self._async_end_chunk)
+            if loop.time() - self._chunk_started < INGRESS_CHUNK_BUDGET:
+                self._async_ingest(topic, descriptor, payload)
+                return
+            self._ingress_task = self.mqtt_client.hass.async_create_task(
+                self._async_drain_ingress(), eager_start=False
+            )
+        self.ingress.put(topic, descriptor, payload)
+
+    @callback
+    def _async_end_chunk(self) -> None:
+        """Start a new time budget in the next loop iteration."""
+        self._chunk_reset = None
+        self._chunk_started = None
+
+    async def _async_drain_ingress(self) -> None:
+        """
+        Ingest the queued messages in chunks, yielding to the loop in between.
+
+        Each chunk ingests at least one message and ends once it used up its
+        time budget, so a flood of retained messages never blocks the loop.
+        """
+        loop = self.mqtt_client.hass.loop
+        try:
+            while self.ingress:
+                self.ingress.chunks += 1
+                started = loop.time()
+                while (pending := self.ingress.pop()) is not None:
+                    self._async_ingest(*pending)
+                    if loop.time() - started >= INGRESS_CHUNK_BUDGET:
+                        break
+                await asyncio.sleep(0)
+        finally:
+            self._ingress_task = None
+
+    @callback
+    def _async_ingest(
+        self, topic: str, descriptor: AttributeDescriptor, payload: Any
+    ) -> None:
+        """Deduplicate, decode, remember and dispatch the payload of a topic."""
+        last = self._last_messages.get(topic)
+        changed = last is None or last.payload != payload
+        if changed and topic.startswith(self._attribute_prefix):
+            # Periodic reports and re-publishes of the same payload are not
+            # the box acting on a command
+            self.mqtt_client.round_trips.async_attribute_reported(descriptor.attribute)
+        if topic not in self._deduplication_exempt_topics:
+            if not changed:
+                self.duplicate_hits += 1
+                return
+            self.duplicate_misses += 1
+
+        try:
+            value = decode(descriptor, payload)
+        except (TypeError, ValueError):
+            # A malformed payload must not stop the messages queued after it
+            LOGGER.warning(
+                "Ignoring malformed payload on %(topic)s: %(payload)r",
+                {"topic": topic, "payload": payload},
+            )
+            return
+        message = PhonieboxMessage(
+            topic=topic, descriptor=descriptor, payload=payload, value=value
+        )
+        self._last_messages[topic] = message
+        if descriptor.key == TOPIC_DOMAIN_STATE:
+            self.mqtt_client.commands.async_set_online(
+                message.value != PHONIEBOX_STATE_OFFLINE
+            )
+
+        if descriptor.key in self._update_intervals and self._async_throttle(
+            topic, self._update_intervals[descriptor.key]
+        ):
+            return
+
+        self._async_dispatch(message)
+
+    @callback
+    def _async_dispatch(self, message: PhonieboxMessage) -> None:
+        """Hand a message to the handlers of its descriptor."""
+        handlers = self._listeners.get(message.descriptor.key)
+        if not handlers:
+            return
+
+        for handler in tuple(handlers):
+            handler(message)
+
+    @callback
+    def async_set_update_intervals(self, intervals: dict[str, float]) -> None:
+        """
+        Set the minimum seconds between two updates of the given topics.
+
+        Messages held back by a previous interval are dispatched right away.
+        """
+        self._update_intervals = intervals
+        for topic in tuple(self._trailing_dispatches):
+            self._trailing_dispatches.pop(topic)()
+            self._async_dispatch_latest(topic)
+
+    @callback
+    def _async_throttle(self, topic: str, interval: float) -> bool:
+        """
+        Return True if the message of the topic must wait for its interval.
+
+        The latest message of a held back topic is dispatched once the
+        interval passed (trailing edge), so the final value is never lost.
+        """
+        if topic in self._trailing_dispatches:
+            self.throttled_messages += 1
+            return True
+
+        now = dt_util.utcnow()
+        last = self._last_dispatched.get(topic)
+        if last is not None and (elapsed := (now - last).total_seconds()) < interval:
+            self.throttled_messages += 1
+
+            @callback
+            def _async_trailing_dispatch(_now: datetime) -> None:
+                self._trailing_dispatches.pop(topic, None)
+                self._async_dispatch_latest(topic)
+
+            self._trailing_dispatches[topic] = async_call_later(
+                self.mqtt_client.hass, interval - elapsed, _async_trailing_dispatch
+            )
+            return True
+
+        self._last_dispatched[topic] = now
+        return False
+
+    @callback
+    def _async_dispatch_latest(self, topic: str) -> None:
+        """Dispatch the latest message of a topic held back by its interval."""
+        message = self._last_messages.get(topic)
+        if message is None:
+            return
+        self._last_dispatched[topic] = dt_util.utcnow()
+        self._async_dispatch(message)
@@ -0,0 +1,466 @@
+"""
+Attribute descriptors of the Phoniebox integration.
+
+Every topic the phoniebox publishes below its base topic is described once
+here: how its payload is parsed, which platforms consume it and how the
+resulting entities look. The registry is compiled at import into a single
+dict keyed by the topic relative to the base topic, so classifying a message
+is one lookup and a new attribute needs no new branching code.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import TYPE_CHECKING, Any, Final, NamedTuple
+
+from homeassistant.components.media_player.const import MediaPlayerState, RepeatMode
+from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTemperature
+
+from .codec import (
+    decode_bool,
+    decode_float,
+    decode_int,
+    decode_max_volume,
+    decode_seconds,
+    decode_source,
+    decode_temperature,
+    decode_text,
+    decode_track,
+)
+from .const import (
+    BINARY_SENSOR,
+    CONF_MIN_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    MEDIA_PLAYER,
+    PHONIEBOX_ATTR_ALBUM,
+    PHONIEBOX_ATTR_ALBUM_ARTIST,
+    PHONIEBOX_ATTR_ARTIST,
+    PHONIEBOX_ATTR_DISK_AVAILABLE,
+    PHONIEBOX_ATTR_DISK_TOTAL,
+    PHONIEBOX_ATTR_DURATION,
+    PHONIEBOX_ATTR_EDITION,
+    PHONIEBOX_ATTR_ELAPSED,
+    PHONIEBOX_ATTR_GPIO,
+    PHONIEBOX_ATTR_LAST_CARD,
+    PHONIEBOX_ATTR_MAX_VOLUME,
+    PHONIEBOX_ATTR_MUTE,
+    PHONIEBOX_ATTR_RANDOM,
+    PHONIEBOX_ATTR_REPEAT,
+    PHONIEBOX_ATTR_RFID,
+    PHONIEBOX_ATTR_STATE,
+    PHONIEBOX_ATTR_THROTTLING,
+    PHONIEBOX_ATTR_TITLE,
+    PHONIEBOX_ATTR_TRACK,
+    PHONIEBOX_ATTR_VERSION,
+    PHONIEBOX_ATTR_VOLUME,
+    PHONIEBOX_ATTR_VOLUME_STEPS,
+    PHONIEBOX_CMD_MUTE,
+    PHONIEBOX_CMD_SET_GPIO,
+    PHONIEBOX_CMD_SET_RFID,
+    PHONIEBOX_START,
+    PHONIEBOX_STATE_TO_HA,
+    PHONIEBOX_STOP,
+    SENSOR,
+    SWITCH,
+    TOPIC_DOMAIN_FILE,
+    TOPIC_DOMAIN_STATE,
+    TOPIC_DOMAIN_TEMPERATUR,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping
+
+ATTRIBUTE_TOPIC_PREFIX: Final[str] = "attribute/"
+COMMAND_TOPIC_PREFIX: Final[str] = "cmd/"
+# Topic holding a JSON object of all attributes, e.g. {"volume": 40, ...}
+BULK_STATE_TOPIC: Final[str] = "attributes"
+
+
+class IngressPriority(IntEnum):
+    """Order in which queued messages are ingested, most important first."""
+
+    # Availability of the box and the player state
+    STATE = 0
+    # Values the user sees or changes directly, e.g. volume or the last card
+    CONTROL = 1
+    # Track metadata
+    METADATA = 2
+    # Playback position and diagnostics
+    BACKGROUND = 3
+
+
+class AttributeSetter(NamedTuple):
+    """Target entity attribute of the media player for a decoded value."""
+
+    target: str
+    convert: Callable[[Any], Any] | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class SwitchCommand:
+    """The command a switch publishes to toggle an attribute."""
+
+    topic: str
+    on_payload: str = ""
+    off_payload: str = ""
+    entity_category: EntityCategory | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class AttributeDescriptor:  # pylint: disable=too-many-instance-attributes
+    """
+    Description of a topic published by the phoniebox.
+
+    Attributes
+    ----------
+        key: The topic relative to the base topic, e.g. "attribute/volume".
+        attribute: The phoniebox attribute, the last segment of the key.
+        name: The name of the entities created for the attribute.
+        value_type: The type of the decoded value.
+        parse: The codec decoder turning the payload text into the value.
+        platforms: The platforms consuming the topic.
+        entity_category: Entity category of the sensor.
+        unit: Unit of measurement of the sensor.
+        device_class: Device class of the sensor.
+        sensor_value: Converts the decoded value into the sensor value.
+        media_player: Where and how the media player stores the value.
+        switch: The command toggling the attribute from a switch.
+        deduplicate: Whether repeated identical payloads may be dropped.
+        priority: Ingress priority of the topic while messages are queued.
+
+    """
+
+    key: str
+    attribute: str
+    name: str
+    value_type: type
+    parse: Callable[[str], Any]
+    platforms: frozenset[str]
+    entity_category: EntityCategory | None = None
+    unit: str | None = None
+    device_class: SensorDeviceClass | None = None
+    sensor_value: Callable[[Any], Any] | None = None
+    media_player: AttributeSetter | None = None
+    switch: SwitchCommand | None = None
+    deduplicate: bool = True
+    priority: IngressPriority = IngressPriority.METADATA
+
+
+def _volume_level(volume: float) -> float:
+    return volume / 100.0
+
+
+def _player_state(state: str) -> MediaPlayerState:
+    return PHONIEBOX_STATE_TO_HA[state]
+
+
+def _repeat_mode(repeat: bool) -> RepeatMode:  # noqa: FBT001
+    # is bad but phoniebox will only say if repeat is on or off
+    return RepeatMode.ONE if repeat else RepeatMode.OFF
+
+
+def _attribute(  # noqa: PLR0913
+    attribute: str,
+    *platforms: str,
+    name: str | None = None,
+    value_type: type = str,
+    parse: Callable[[str], Any] = decode_text,
+    entity_category: EntityCategory | None = None,
+    unit: str | None = None,
+    device_class: SensorDeviceClass | None = None,
+    sensor_value: Callable[[Any], Any] | None = None,
+    media_player: AttributeSetter | None = None,
+    switch: SwitchCommand | None = None,
+    deduplicate: bool = True,
+    priority: IngressPriority = IngressPriority.METADATA,
+) -> AttributeDescriptor:
+    """Describe a topic below attribute/."""
+    return AttributeDescriptor(
+        key=f"{ATTRIBUTE_TOPIC_PREFIX}{attribute}",
+        attribute=attribute,
+        name=name or attribute,
+        value_type=value_type,
+        parse=parse,
+        platforms=frozenset(platforms),
+        entity_category=entity_category,
+        unit=unit,
+        device_class=device_class,
+        sensor_value=sensor_value,
+        media_player=media_player,
+        switch=switch,
+        deduplicate=deduplicate,
+        priority=priority,
+    )
+
+
+def _boolean(
+    attribute: str,
+    *platforms: str,
+    media_player: AttributeSetter | None = None,
+    switch: SwitchCommand | None = None,
+) -> AttributeDescriptor:
+    """Describe a boolean topic below attribute/."""
+    return _attribute(
+        attribute,
+        BINARY_SENSOR,
+        *platforms,
+        value_type=bool,
+        parse=decode_bool,
+        media_player=media_player,
+        switch=switch,
+        priority=IngressPriority.CONTROL,
+    )
+
+
+def _diagnostic(
+    attribute: str, unit: str | None = None, **kwargs: Any
+) -> AttributeDescriptor:
+    """Describe a diagnostic sensor topic below attribute/."""
+    return _attribute(
+        attribute,
+        SENSOR,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        unit=unit,
+        priority=IngressPriority.BACKGROUND,
+        **kwargs,
+    )
+
+
+_DESCRIPTORS: Final[tuple[AttributeDescriptor, ...]] = (
+    # The availability of the box itself
+    AttributeDescriptor(
+        key=TOPIC_DOMAIN_STATE,
+        attribute=TOPIC_DOMAIN_STATE,
+        name="state",
+        value_type=str,
+        parse=decode_text,
+        platforms=frozenset((SENSOR, MEDIA_PLAYER)),
+        priority=IngressPriority.STATE,
+    ),
+    # Player
+    _attribute(
+        PHONIEBOX_ATTR_STATE,
+        SENSOR,
+        MEDIA_PLAYER,
+        name="player state",
+        media_player=AttributeSetter("_attr_state", _player_state),
+        priority=IngressPriority.STATE,
+    ),
+    _attribute(
+        PHONIEBOX_ATTR_VOLUME,
+        MEDIA_PLAYER,
+        value_type=float,
+        parse=decode_float,
+        media_player=AttributeSetter("_attr_volume_level", _volume_level),
+        priority=IngressPriority.CONTROL,
+    ),
+    _attribute(
+        PHONIEBOX_ATTR_MAX_VOLUME,
+        MEDIA_PLAYER,
+        value_type=int,
+        parse=decode_max_volume,
+        media_player=AttributeSetter("_max_volume"),
+        priority=IngressPriority.CONTROL,
+    ),
+    _attribute(
+        PHONIEBOX_ATTR_VOLUME_STEPS,
+        MEDIA_PLAYER,
+        value_type=int,
+        parse=decode_int,
+        media_player=AttributeSetter("_vol_steps"),
+        priority=IngressPriority.CONTROL,
+    ),
+    _attribute(
+        PHONIEBOX_ATTR_ELAPSED,
+        MEDIA_PLAYER,
+        value_type=int,
+        parse=decode_seconds,
+        media_player=AttributeSetter("_attr_media_position"),
+        priority=IngressPriority.BACKGROUND,
+    ),
+    _attribute(
+        PHONIEBOX_ATTR_DURATION,
+        MEDIA_PLAYER,
+        value_type=int,
+        parse=decode_seconds,
+        media_player=AttributeSetter("_attr_media_duration"),
+    ),
+    _attribute(
+        PHONIEBOX_ATTR_TRACK,
+        MEDIA_PLAYER,
+        value_type=int,
+        parse=decode_track,
+        media_player=AttributeSetter("_attr_media_track"),
+    ),
+    _attribute(
+        PHONIEBOX_ATTR_TITLE,
+        MEDIA_PLAYER,
+        media_player=AttributeSetter("_attr_media_title"),
+    ),
+    _attribute(
+        PHONIEBOX_ATTR_ARTIST,
+        SENSOR,
+        MEDIA_PLAYER,
+        media_player=AttributeSetter("_attr_media_artist"),
+    ),
+    _attribute(
+        PHONIEBOX_ATTR_ALBUM,
+        SENSOR,
+        MEDIA_PLAYER,
+        media_player=AttributeSetter("_attr_media_album_name"),
+    ),
+    _attribute(
+        PHONIEBOX_ATTR_ALBUM_ARTIST,
+        SENSOR,
+        MEDIA_PLAYER,
+        media_player=AttributeSetter("_attr_media_album_artist"),
+    ),
+    _attribute(
+        TOPIC_DOMAIN_FILE,
+        SENSOR,
+        MEDIA_PLAYER,
+        name="source",
+        parse=decode_text,
+        sensor_value=decode_source,
+        media_player=AttributeSetter("_attr_media_content_id"),
+    ),
+    _attribute(
+        PHONIEBOX_ATTR_LAST_CARD,
+        SENSOR,
+        deduplicate=False,
+        priority=IngressPriority.CONTROL,
+    ),
+    # Toggles
+    _boolean(
+        PHONIEBOX_ATTR_MUTE,
+        SWITCH,
+        MEDIA_PLAYER,
+        media_player=AttributeSetter("_attr_is_volume_muted"),
+        switch=SwitchCommand(PHONIEBOX_CMD_MUTE),
+    ),
+    _boolean(
+        PHONIEBOX_ATTR_RANDOM,
+        MEDIA_PLAYER,
+        media_player=AttributeSetter("_attr_shuffle"),
+    ),
+    _boolean(
+        PHONIEBOX_ATTR_REPEAT,
+        MEDIA_PLAYER,
+        media_player=AttributeSetter("_attr_repeat", _repeat_mode),
+    ),
+    _boolean(
+        PHONIEBOX_ATTR_GPIO,
+        SWITCH,
+        switch=SwitchCommand(
+            PHONIEBOX_CMD_SET_GPIO,
+            PHONIEBOX_START,
+            PHONIEBOX_STOP,
+            EntityCategory.CONFIG,
+        ),
+    ),
+    _boolean(
+        PHONIEBOX_ATTR_RFID,
+        SWITCH,
+        switch=SwitchCommand(
+            PHONIEBOX_CMD_SET_RFID,
+            PHONIEBOX_START,
+            PHONIEBOX_STOP,
+            EntityCategory.CONFIG,
+        ),
+    ),
+    # Diagnostics
+    _diagnostic(PHONIEBOX_ATTR_VERSION),
+    _diagnostic(PHONIEBOX_ATTR_EDITION),
+    _diagnostic(PHONIEBOX_ATTR_THROTTLING),
+    _diagnostic(
+        TOPIC_DOMAIN_TEMPERATUR,
+        UnitOfTemperature.CELSIUS,
+        value_type=float,
+        parse=decode_temperature,
+        device_class=SensorDeviceClass.TEMPERATURE,
+    ),
+    _diagnostic(PHONIEBOX_ATTR_DISK_AVAILABLE, UnitOfInformation.GIGABYTES),
+    _diagnostic(PHONIEBOX_ATTR_DISK_TOTAL, UnitOfInformation.GIGABYTES),
+)
+
+# Topic relative to the base topic -> descriptor
+ATTRIBUTE_DESCRIPTORS: Final[dict[str, AttributeDescriptor]] = {
+    descriptor.key: descriptor for descriptor in _DESCRIPTORS
+}
+_ATTRIBUTE_KEYS: Final[frozenset[str]] = frozenset(
+    key for key in ATTRIBUTE_DESCRIPTORS if key.startswith(ATTRIBUTE_TOPIC_PREFIX)
+)
+
+
+def topic_filters(platforms: Iterable[str], *, bulk: bool = False) -> tuple[str, ...]:
+    """
+    Return the fewest topic filters covering the topics of the platforms.
+
+    If the platforms consume every attribute a single "attribute/+" filter is
+    used, otherwise the consumed topics are listed one by one, so the broker
+    never sends topics no entity uses. With bulk the attributes are received
+    through the bulk state topic instead.
+    """
+    enabled = frozenset(platforms)
+    keys = {
+        descriptor.key for descriptor in _DESCRIPTORS if descriptor.platforms & enabled
+    }
+    attribute_keys = {key for key in keys if key.startswith(ATTRIBUTE_TOPIC_PREFIX)}
+    if bulk:
+        filters = [BULK_STATE_TOPIC] if attribute_keys else []
+    elif attribute_keys == _ATTRIBUTE_KEYS:
+        filters = [f"{ATTRIBUTE_TOPIC_PREFIX}+"]
+    else:
+        filters = sorted(attribute_keys)
+    filters.extend(sorted(keys - attribute_keys))
+    return tuple(filters)
+
+
+def keys_for_platform(platform: str) -> tuple[str, ...]:
+    """Return the keys of all topics consumed by the given platform."""
+    return tuple(
+        descriptor.key
+        for descriptor in _DESCRIPTORS
+        if platform in descriptor.platforms
+    )
+
+
+# Entity categories whose update interval can be limited as a whole
+UPDATE_INTERVAL_CATEGORIES: Final[tuple[EntityCategory, ...]] = (
+    EntityCategory.DIAGNOSTIC,
+)
+# Attributes whose update interval can be limited one by one
+UPDATE_INTERVAL_ATTRIBUTES: Final[tuple[str, ...]] = tuple(
+    descriptor.attribute
+    for descriptor in _DESCRIPTORS
+    if descriptor.entity_category in UPDATE_INTERVAL_CATEGORIES
+)
+
+
+def update_interval_option(name: str) -> str:
+    """Return the option key of the update interval of a category or attribute."""
+    return f"{CONF_MIN_UPDATE_INTERVAL}_{name}"
+
+
+def update_intervals(options: Mapping[str, Any]) -> dict[str, float]:
+    """
+    Return the minimum update interval in seconds of every limited topic.
+
+    The interval of an attribute wins over the one of its category, an
+    attribute interval of 0 falls back to the category.
+    """
+    intervals: dict[str, float] = {}
+    for descriptor in _DESCRIPTORS:
+        interval = options.get(
+            update_interval_option(descriptor.attribute), DEFAULT_MIN_UPDATE_INTERVAL
+        )
+        if not interval and descriptor.entity_category is not None:
+            interval = options.get(
+                update_interval_option(descriptor.entity_category),
+                DEFAULT_MIN_UPDATE_INTERVAL,
+            )
+        if interval and interval > 0:
+            intervals[descriptor.key] = float(interval)
+    return intervals
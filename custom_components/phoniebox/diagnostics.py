@@ -0,0 +1,56 @@
+"""Diagnostics support for phoniebox."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+
+    from .data_coordinator import DataCoordinator
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: DataCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    return {
+        "entry": {
+            "data": dict(entry.data),
+            "options": dict(entry.options),
+        },
+        "platforms": coordinator.platforms,
+        "version": coordinator.version,
+        "ingestion_mode": {
+            "configured": coordinator.ingestion_mode,
+            "bulk_state": coordinator.uses_bulk_state,
+            "bulk_messages": coordinator.bulk_messages,
+        },
+        "ingress": {
+            "command_echoes": coordinator.command_echoes,
+            "duplicate_hits": coordinator.duplicate_hits,
+            "duplicate_misses": coordinator.duplicate_misses,
+            "suppressed_writes": coordinator.suppressed_writes,
+            "throttled_messages": coordinator.throttled_messages,
+            "state_writes": coordinator.state_flush.writes,
+            "coalesced_writes": coordinator.state_flush.coalesced_writes,
+        },
+        "ingress_queue": coordinator.ingress.as_dict(),
+        "optimistic": {
+            "confirmed": coordinator.optimistic_confirmed,
+            "corrected": coordinator.optimistic_corrected,
+            "rolled_back": coordinator.optimistic_rolled_back,
+        },
+        "commands": coordinator.mqtt_client.commands.as_dict(),
+        "offline_buffer": (
+            coordinator.mqtt_client.commands.offline_buffer.as_dict()
+            if coordinator.mqtt_client.commands.offline_buffer is not None
+            else None
+        ),
+        "round_trips": coordinator.mqtt_client.round_trips.as_dict(),
+    }
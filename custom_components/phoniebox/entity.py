@@ -4,6 +4,7 @@ from functools import cached_property
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity import Entity
 
@@ -22,6 +23,11 @@ class PhonieboxEntity(Entity):
         self.coordinator = coordinator
         self.mqtt_client = coordinator.mqtt_client
 
+    @callback
+    def async_schedule_flush(self) -> None:
+        """Write the state with the other changed entities of this box."""
+        self.coordinator.state_flush.async_mark_dirty(self)
+
     @cached_property
     def unique_id(self) -> str | None:
         """Return a unique ID to use for this entity."""
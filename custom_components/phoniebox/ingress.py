@@ -0,0 +1,135 @@
+"""
+Ingress queue of the Phoniebox integration.
+
+While the coordinator keeps up, every message is ingested right away. When a
+burst (e.g. a reconnect replaying all retained topics) exceeds the time one
+loop iteration may spend ingesting, the remaining messages wait here and are
+ingested in chunks, yielding to the event loop in between, most important
+first. A topic waits at most once with its latest payload, except for topics
+whose every payload counts (e.g. the last card), which wait in order. The
+queue is bounded well above the number of topics of a box, once full the least
+important messages are dropped.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from .descriptors import IngressPriority
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable
+
+    from .descriptors import AttributeDescriptor
+
+PendingMessage = tuple[str, "AttributeDescriptor", Any]
+
+
+class IngressQueue:
+    """
+    Bounded priority queue of messages waiting to be ingested.
+
+    Messages of the same priority are ingested in the order they arrived.
+    """
+
+    def __init__(self, max_depth: int) -> None:
+        """
+        Init an empty queue.
+
+        Args:
+        ----
+            max_depth: The number of messages that may wait at the same time
+
+        """
+        self._max_depth = max_depth
+        # Priority -> key -> message, oldest first. A topic is its own key,
+        # unless it is exempt from deduplication and each message gets one.
+        self._pending: tuple[dict[Hashable, PendingMessage], ...] = tuple(
+            {} for _ in IngressPriority
+        )
+        self._sequence = 0
+        self._depth = 0
+        self.peak_depth = 0
+        self.coalesced = 0
+        # Chunks ingested from the queue
+        self.chunks = 0
+        self.dropped: dict[IngressPriority, int] = dict.fromkeys(IngressPriority, 0)
+
+    def __len__(self) -> int:
+        """Return the number of waiting messages."""
+        return self._depth
+
+    def put(self, topic: str, descriptor: AttributeDescriptor, payload: Any) -> bool:
+        """
+        Queue the payload of a topic.
+
+        A topic already waiting keeps its place and takes the new payload. A
+        full queue drops its oldest message of the lowest priority to make
+        room, or the new message if all waiting ones are more important.
+
+        Returns
+        -------
+            False if the message was dropped
+
+        """
+        priority = descriptor.priority
+        pending = self._pending[priority]
+        key: Hashable = topic
+        if descriptor.deduplicate:
+            if topic in pending:
+                pending[topic] = (topic, descriptor, payload)
+                self.coalesced += 1
+                return True
+        else:
+            self._sequence += 1
+            key = (topic, self._sequence)
+
+        if self._depth >= self._max_depth and not self._shed(priority):
+            self.dropped[priority] += 1
+            return False
+
+        pending[key] = (topic, descriptor, payload)
+        self._depth += 1
+        self.peak_depth = max(self.peak_depth, self._depth)
+        return True
+
+    def pop(self) -> PendingMessage | None:
+        """Return the oldest message of the highest priority, None if empty."""
+        for pending in self._pending:
+            if pending:
+                message = pending.pop(next(iter(pending)))
+                self._depth -= 1
+                return message
+        return None
+
+    def clear(self) -> None:
+        """Drop all waiting messages without counting them."""
+        for pending in self._pending:
+            pending.clear()
+        self._depth = 0
+
+    def _shed(self, priority: IngressPriority) -> bool:
+        """Drop the oldest message of the lowest priority down to priority."""
+        for shed in reversed(IngressPriority):
+            if shed < priority:
+                break
+            pending = self._pending[shed]
+            if pending:
+                del pending[next(iter(pending))]
+                self._depth -= 1
+                self.dropped[shed] += 1
+                return True
+        return False
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters of the queue for the diagnostics."""
+        return {
+            "depth": self._depth,
+            "peak_depth": self.peak_depth,
+            "max_depth": self._max_depth,
+            "coalesced": self.coalesced,
+            "chunks": self.chunks,
+            "dropped": {
+                priority.name.lower(): count for priority, count in self.dropped.items()
+            },
+        }
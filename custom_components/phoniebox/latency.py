@@ -0,0 +1,148 @@
+"""
+Command round-trip latency of the Phoniebox integration.
+
+Every published command is matched with the first report of the attribute it
+changes, e.g. `setvolume` with `attribute/volume`. The time in between is the
+round trip: broker, Wi-Fi and the box acting on the command. The latencies of
+the most recent round trips are kept in a compact histogram, so percentiles
+are cheap to read and memory does not grow with the uptime of a box.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
+# Upper bounds of the histogram buckets in milliseconds, 25% apart from 5 ms
+# to about a minute. A percentile is reported as the bound of its bucket.
+BUCKET_BOUNDS: tuple[float, ...] = tuple(
+    round(5 * 1.25**index, 1) for index in range(43)
+)
+
+
+class LatencyHistogram:
+    """Histogram of the latencies of the most recent round trips."""
+
+    def __init__(self, window: int) -> None:
+        """
+        Init an empty histogram.
+
+        Args:
+        ----
+            window: The number of most recent latencies taken into account
+
+        """
+        # Bucket index of each latency in the window, oldest first
+        self._samples: deque[int] = deque(maxlen=window)
+        # One more bucket for latencies beyond the last bound
+        self._counts = [0] * (len(BUCKET_BOUNDS) + 1)
+
+    def __len__(self) -> int:
+        """Return the number of latencies in the window."""
+        return len(self._samples)
+
+    def record(self, latency: float) -> None:
+        """Add a latency in seconds, evicting the oldest one of a full window."""
+        if len(self._samples) == self._samples.maxlen:
+            self._counts[self._samples[0]] -= 1
+        bucket = bisect_left(BUCKET_BOUNDS, latency * 1000)
+        self._samples.append(bucket)
+        self._counts[bucket] += 1
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the percentile in milliseconds, None without latencies."""
+        if not self._samples:
+            return None
+        rank = percent / 100 * len(self._samples)
+        seen = 0
+        for bucket, count in enumerate(self._counts):
+            seen += count
+            if count and seen >= rank:
+                return BUCKET_BOUNDS[min(bucket, len(BUCKET_BOUNDS) - 1)]
+        return BUCKET_BOUNDS[-1]
+
+
+class RoundTripTracker:
+    """Match published commands with the attribute reports they cause."""
+
+    def __init__(
+        self,
+        clock: Callable[[], float],
+        command_attributes: Mapping[str, str],
+        timeout: float,
+        window: int,
+    ) -> None:
+        """
+        Init the tracker.
+
+        Args:
+        ----
+            clock: Returns the current time in seconds
+            command_attributes: Command -> attribute the box reports after it
+            timeout: Seconds after which a command is no longer matched
+            window: The number of most recent round trips in the histogram
+
+        """
+        self._clock = clock
+        self._command_attributes = command_attributes
+        self._timeout = timeout
+        # Attribute -> time the latest unmatched command changing it was sent
+        self._pending: dict[str, float] = {}
+        self._listeners: list[Callable[[], None]] = []
+        self.histogram = LatencyHistogram(window)
+        self.matched = 0
+        self.expired = 0
+
+    @callback
+    def async_command_sent(self, command: str) -> None:
+        """Start the round trip of a published command."""
+        attribute = self._command_attributes.get(command)
+        if attribute is not None:
+            # Measured from the latest command, the value the box ends up
+            # reporting is the one it set
+            self._pending[attribute] = self._clock()
+
+    @callback
+    def async_attribute_reported(self, attribute: str) -> None:
+        """End the round trip of the command waiting for the changed attribute."""
+        sent = self._pending.pop(attribute, None)
+        if sent is None:
+            return
+        latency = self._clock() - sent
+        if latency > self._timeout:
+            # The box never acted on the command, this is an unrelated report
+            self.expired += 1
+            return
+        self.matched += 1
+        self.histogram.record(latency)
+        for listener in tuple(self._listeners):
+            listener()
+
+    @callback
+    def async_add_listener(self, listener: Callable[[], None]) -> CALLBACK_TYPE:
+        """Call the listener after each matched round trip."""
+        self._listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return remove_listener
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the round trip statistics for the diagnostics."""
+        return {
+            "matched": self.matched,
+            "expired": self.expired,
+            "window": len(self.histogram),
+            "p50": self.histogram.percentile(50),
+            "p95": self.histogram.percentile(95),
+            "p99": self.histogram.percentile(99),
+        }
@@ -1,7 +1,8 @@
 """MediaPlayer class."""
 
 from abc import ABC
-from typing import override
+from datetime import datetime
+from typing import Any, NamedTuple, override
 
 from homeassistant.components.media_player import MediaPlayerEntity
 from homeassistant.components.media_player.const import (
@@ -10,33 +11,31 @@ from homeassistant.components.media_player.const import (
     MediaType,
     RepeatMode,
 )
-from homeassistant.components.mqtt.models import ReceiveMessage
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import STATE_UNAVAILABLE
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
 from homeassistant.util import slugify
 
 from .const import (
+    CONF_OPTIMISTIC,
     CONF_PHONIEBOX_NAME,
+    CONF_POSITION_DRIFT_THRESHOLD,
+    DEFAULT_OPTIMISTIC,
+    DEFAULT_POSITION_DRIFT_THRESHOLD,
     DOMAIN,
     HA_REPEAT_TO_PHONIEBOX,
     LOGGER,
+    MEDIA_PLAYER,
     MEDIA_PLAYER_STATE_UNKNOWN,
-    PHONIEBOX_ATTR_ALBUM,
-    PHONIEBOX_ATTR_ALBUM_ARTIST,
-    PHONIEBOX_ATTR_ARTIST,
-    PHONIEBOX_ATTR_DURATION,
+    OPTIMISTIC_TIMEOUT,
     PHONIEBOX_ATTR_ELAPSED,
-    PHONIEBOX_ATTR_MAX_VOLUME,
     PHONIEBOX_ATTR_MUTE,
     PHONIEBOX_ATTR_RANDOM,
-    PHONIEBOX_ATTR_REPEAT,
     PHONIEBOX_ATTR_STATE,
-    PHONIEBOX_ATTR_TITLE,
-    PHONIEBOX_ATTR_TRACK,
     PHONIEBOX_ATTR_VOLUME,
-    PHONIEBOX_ATTR_VOLUME_STEPS,
     PHONIEBOX_CMD_MUTE,
     PHONIEBOX_CMD_PLAY_FOLDER,
     PHONIEBOX_CMD_PLAY_FOLDER_RECURSIVE,
@@ -66,14 +65,19 @@ from .const import (
     PHONIEBOX_CMD_VOLUME_DOWN,
     PHONIEBOX_CMD_VOLUME_UP,
     PHONIEBOX_STATE_OFFLINE,
-    PHONIEBOX_STATE_TO_HA,
     SUPPORT_MQTTMEDIAPLAYER,
     TO_PHONIEBOX_START_STOP,
+    TOPIC_DOMAIN_STATE,
+    TRACK_CHANGE_ATTRIBUTES,
+    TRACK_CHANGE_COMPLETE_ATTRIBUTES,
+    TRACK_CHANGE_TIMEOUT,
+    TRACK_METADATA_ATTRIBUTES,
 )
-from .data_coordinator import DataCoordinator
+from .data_coordinator import DataCoordinator, PhonieboxMessage
+from .descriptors import ATTRIBUTE_DESCRIPTORS, keys_for_platform
 from .entity import PhonieboxEntity
 from .services import async_register_custom_services
-from .utils import bool_to_string, parse_float_save, parse_int_save, string_to_bool
+from .utils import bool_to_string, parse_int_save
 
 
 async def async_setup_entry(
@@ -91,6 +95,22 @@ def _slug(phoniebox_name: str) -> str:
     return f"media_player.phoniebox_{slugify(phoniebox_name)}"
 
 
+# Phoniebox attribute -> media player attribute holding its value
+_TARGETS = {
+    descriptor.attribute: descriptor.media_player.target
+    for descriptor in ATTRIBUTE_DESCRIPTORS.values()
+    if descriptor.media_player is not None
+}
+
+
+class OptimisticChange(NamedTuple):
+    """An attribute set before the box confirmed it."""
+
+    expected: Any
+    previous: Any
+    cancel_deadline: CALLBACK_TYPE
+
+
 class PhonieboxMediaPlayer(PhonieboxEntity, MediaPlayerEntity, ABC):
     """The Phoniebox media player."""
 
@@ -118,57 +138,214 @@ class PhonieboxMediaPlayer(PhonieboxEntity, MediaPlayerEntity, ABC):
         self._attr_media_album_name = None
         self._attr_media_title = None
         self._attr_media_track = None
+        self._attr_media_content_id = None
         self._vol_steps = 5
-
-    async def async_set_attributes(self, msg: ReceiveMessage) -> None:  # noqa: PLR0912
-        """Set volume level."""
-        changed_attribute_name = msg.topic.split("/")[2]
-        new_value = str(msg.payload)
-
-        if changed_attribute_name == PHONIEBOX_ATTR_VOLUME:
-            self._attr_volume_level = parse_float_save(new_value) / 100.0
-        elif changed_attribute_name == PHONIEBOX_ATTR_STATE:
-            self._attr_state = PHONIEBOX_STATE_TO_HA[new_value]
-        elif changed_attribute_name == PHONIEBOX_ATTR_MUTE:
-            self._attr_is_volume_muted = string_to_bool(new_value)
-        elif changed_attribute_name == PHONIEBOX_ATTR_RANDOM:
-            self._attr_shuffle = string_to_bool(new_value)
-        elif changed_attribute_name == PHONIEBOX_ATTR_MAX_VOLUME:
-            self._max_volume = parse_int_save(new_value, 100)
-        elif changed_attribute_name == PHONIEBOX_ATTR_DURATION:
-            self._attr_media_duration = sum(
-                x * parse_int_save(t)
-                for x, t in zip([3600, 60, 1], new_value.split(":"), strict=False)
+        # Last elapsed time reported by the box, the published media position
+        # is only moved when it drifts away from the interpolated one
+        self._elapsed = 0
+        # Metadata received since a track change started -> (target, value),
+        # applied at once when it is complete or the timeout passed
+        self._track_change: dict[str, tuple[str, Any]] | None = None
+        self._cancel_track_change_timeout: CALLBACK_TYPE | None = None
+        # Attribute -> change waiting for the box to report the attribute
+        self._optimistic: dict[str, OptimisticChange] = {}
+
+    @property
+    def _position_drift_threshold(self) -> float:
+        """Return the allowed drift, read live so option changes apply."""
+        return float(
+            self.config_entry.options.get(
+                CONF_POSITION_DRIFT_THRESHOLD, DEFAULT_POSITION_DRIFT_THRESHOLD
             )
-        elif changed_attribute_name == PHONIEBOX_ATTR_TRACK:
-            track_number = new_value.split(sep="/", maxsplit=1)[0]
-            self._attr_media_track = parse_int_save(track_number)
-        elif changed_attribute_name == PHONIEBOX_ATTR_ELAPSED:
-            self._attr_media_position = sum(
-                x * parse_int_save(t)
-                for x, t in zip([3600, 60, 1], new_value.split(":"), strict=False)
-            )
-        elif changed_attribute_name == PHONIEBOX_ATTR_ARTIST:
-            self._attr_media_artist = new_value
-        elif changed_attribute_name == PHONIEBOX_ATTR_TITLE:
-            self._attr_media_title = new_value
-        elif changed_attribute_name == PHONIEBOX_ATTR_ALBUM:
-            self._attr_media_album_name = new_value
-        elif changed_attribute_name == PHONIEBOX_ATTR_ALBUM_ARTIST:
-            self._attr_media_album_artist = new_value
-        elif changed_attribute_name == PHONIEBOX_ATTR_VOLUME_STEPS:
-            self._vol_steps = parse_int_save(new_value)
-        elif changed_attribute_name == PHONIEBOX_ATTR_REPEAT:
-            # is bad but phoniebox will only say if repeat is on or off
-            self._attr_repeat = (
-                RepeatMode.ONE if new_value == "true" else RepeatMode.OFF
+        )
+
+    @property
+    def _is_optimistic(self) -> bool:
+        """Return True if changes are shown before the box confirms them."""
+        return bool(self.config_entry.options.get(CONF_OPTIMISTIC, DEFAULT_OPTIMISTIC))
+
+    @callback
+    def async_handle_message(self, msg: PhonieboxMessage) -> None:
+        """Dispatch a message to the device state or the attribute it is about."""
+        if msg.descriptor.key == TOPIC_DOMAIN_STATE:
+            self.update_device_state(msg)
+        else:
+            self.async_set_attributes(msg)
+
+    @callback
+    def async_set_attributes(self, msg: PhonieboxMessage) -> None:
+        """Set the attribute the message is about."""
+        setter = msg.descriptor.media_player
+        if setter is None:
+            return
+
+        attribute = msg.descriptor.attribute
+        value = msg.value if setter.convert is None else setter.convert(msg.value)
+        if attribute in self._optimistic:
+            self._async_reconcile(attribute, value)
+        if attribute == PHONIEBOX_ATTR_ELAPSED:
+            self._async_set_elapsed(value)
+            return
+        if attribute == PHONIEBOX_ATTR_STATE and value != self._attr_state:
+            # Play/pause/stop: re-anchor the position the frontend interpolates
+            self._attr_media_position = self._elapsed
+            self._attr_media_position_updated_at = dt_util.utcnow()
+
+        if attribute in TRACK_METADATA_ATTRIBUTES and self._async_stage_metadata(
+            attribute, setter.target, value
+        ):
+            return
+        setattr(self, setter.target, value)
+        self.async_schedule_flush()
+
+    async def _async_publish_optimistic(
+        self, attribute: str, value: Any, command: str, payload: Any
+    ) -> None:
+        """
+        Publish a command, showing the value it sets on the attribute first.
+
+        In optimistic mode the expected value is written right away. The box
+        has OPTIMISTIC_TIMEOUT seconds to report the attribute, the reported
+        value always wins and without a report the change is rolled back.
+        """
+        if not self._is_optimistic or self.hass is None:
+            await self.mqtt_client.async_publish_cmd(command, payload)
+            return
+
+        self._async_set_optimistic(attribute, value)
+        try:
+            await self.mqtt_client.async_publish_cmd(command, payload)
+        except Exception:
+            self._async_roll_back(attribute)
+            raise
+
+    @callback
+    def _async_set_optimistic(self, attribute: str, value: Any) -> None:
+        """Show the expected value of an attribute until the box reports it."""
+        target = _TARGETS[attribute]
+        previous = getattr(self, target)
+        if (pending := self._optimistic.pop(attribute, None)) is not None:
+            # Roll back to the last value the box reported, not an optimistic one
+            pending.cancel_deadline()
+            previous = pending.previous
+
+        @callback
+        def _async_deadline(_now: datetime) -> None:
+            self._optimistic.pop(attribute, None)
+            self._async_roll_back_to(attribute, target, previous)
+
+        self._optimistic[attribute] = OptimisticChange(
+            value,
+            previous,
+            async_call_later(self.hass, OPTIMISTIC_TIMEOUT, _async_deadline),
+        )
+        if attribute == PHONIEBOX_ATTR_STATE and value != self._attr_state:
+            self._attr_media_position = self._elapsed
+            self._attr_media_position_updated_at = dt_util.utcnow()
+        setattr(self, target, value)
+        # The report of the box must be applied even if it repeats the payload
+        # it sent before the change
+        self.coordinator.async_forget_payload(attribute)
+        self.async_write_ha_state()
+
+    @callback
+    def _async_reconcile(self, attribute: str, value: Any) -> None:
+        """Settle an optimistic change with the value the box reported."""
+        pending = self._optimistic.pop(attribute)
+        pending.cancel_deadline()
+        if value == pending.expected:
+            self.coordinator.optimistic_confirmed += 1
+        else:
+            self.coordinator.optimistic_corrected += 1
+
+    @callback
+    def _async_roll_back(self, attribute: str) -> None:
+        """Undo an optimistic change, e.g. when its command failed."""
+        if (pending := self._optimistic.pop(attribute, None)) is None:
+            return
+        pending.cancel_deadline()
+        self._async_roll_back_to(attribute, _TARGETS[attribute], pending.previous)
+
+    @callback
+    def _async_roll_back_to(self, attribute: str, target: str, previous: Any) -> None:
+        """Restore the value of an attribute the box did not confirm."""
+        LOGGER.debug("Rolling back unconfirmed %(attribute)s", {"attribute": attribute})
+        self.coordinator.optimistic_rolled_back += 1
+        setattr(self, target, previous)
+        self.async_schedule_flush()
+
+    @callback
+    def _async_stage_metadata(self, attribute: str, target: str, value: Any) -> bool:
+        """
+        Collect the metadata of a track change, False if none is in progress.
+
+        The box sends the metadata of a new track as separate messages. A new
+        file or track starts a transaction holding back the metadata until
+        TRACK_CHANGE_COMPLETE_ATTRIBUTES arrived or TRACK_CHANGE_TIMEOUT passed,
+        so the new track is written once instead of as a series of half
+        states. Other attributes are written as usual meanwhile.
+        """
+        if self._track_change is None:
+            if attribute not in TRACK_CHANGE_ATTRIBUTES:
+                return False
+            self._track_change = {}
+            self._cancel_track_change_timeout = async_call_later(
+                self.hass, TRACK_CHANGE_TIMEOUT, self._async_track_change_timeout
             )
-        self.schedule_update_ha_state(force_refresh=True)
 
-    async def update_device_state(self, msg: ReceiveMessage) -> None:
+        self._track_change[attribute] = (target, value)
+        if self._track_change.keys() >= TRACK_CHANGE_COMPLETE_ATTRIBUTES:
+            self._async_end_track_change()
+        return True
+
+    @callback
+    def _async_track_change_timeout(self, _now: datetime) -> None:
+        """Write an incomplete track change."""
+        self._cancel_track_change_timeout = None
+        self._async_end_track_change()
+
+    @callback
+    def _async_end_track_change(self) -> None:
+        """Apply the metadata of the track change and write it at once."""
+        if self._cancel_track_change_timeout is not None:
+            self._cancel_track_change_timeout()
+            self._cancel_track_change_timeout = None
+        staged, self._track_change = self._track_change or {}, None
+        for target, value in staged.values():
+            setattr(self, target, value)
+        self.async_schedule_flush()
+
+    @callback
+    def _async_set_elapsed(self, elapsed: int) -> None:
+        """
+        Update the media position from the elapsed time of the box.
+
+        While playing, the frontend interpolates the position from
+        media_position_updated_at, so a state is only written on seeks, track
+        changes or when the interpolation drifted beyond the threshold.
+        """
+        self._elapsed = elapsed
+        now = dt_util.utcnow()
+        expected: float = self._attr_media_position or 0
+        updated_at = self._attr_media_position_updated_at
+        if self._attr_state == MediaPlayerState.PLAYING and updated_at is not None:
+            expected += (now - updated_at).total_seconds()
+
+        if (
+            updated_at is not None
+            and abs(elapsed - expected) <= self._position_drift_threshold
+        ):
+            return
+
+        self._attr_media_position = elapsed
+        self._attr_media_position_updated_at = now
+        self.async_schedule_flush()
+
+    @callback
+    def update_device_state(self, msg: PhonieboxMessage) -> None:
         """Update the device state."""
         before_state = self._attr_state
-        if msg.payload == PHONIEBOX_STATE_OFFLINE:
+        if msg.value == PHONIEBOX_STATE_OFFLINE:
             self._attr_state = MediaPlayerState.OFF
         elif self._attr_state in [
             MediaPlayerState.OFF,
@@ -179,14 +356,30 @@ class PhonieboxMediaPlayer(PhonieboxEntity, MediaPlayerEntity, ABC):
             self._attr_state = MediaPlayerState.IDLE
 
         if before_state != self._attr_state:
-            self.schedule_update_ha_state(force_refresh=True)
+            self.async_schedule_flush()
 
     @override
     async def async_added_to_hass(self) -> None:
-        """Subscribe to MQTT events."""
+        """Listen to the messages routed by the coordinator."""
         LOGGER.info("media player added")
-        await self.mqtt_client.async_subscribe("attribute/#", self.async_set_attributes)
-        await self.mqtt_client.async_subscribe("state", self.update_device_state)
+        self.async_on_remove(
+            self.coordinator.async_add_listener(
+                MEDIA_PLAYER,
+                keys_for_platform(MEDIA_PLAYER),
+                self.async_handle_message,
+            )
+        )
+
+    @override
+    async def async_will_remove_from_hass(self) -> None:
+        """Drop an incomplete track change and pending optimistic changes."""
+        if self._cancel_track_change_timeout is not None:
+            self._cancel_track_change_timeout()
+            self._cancel_track_change_timeout = None
+        self._track_change = None
+        for pending in self._optimistic.values():
+            pending.cancel_deadline()
+        self._optimistic.clear()
 
     @override
     async def async_volume_up(self) -> None:
@@ -201,19 +394,29 @@ class PhonieboxMediaPlayer(PhonieboxEntity, MediaPlayerEntity, ABC):
     @override
     async def async_mute_volume(self, mute: bool) -> None:
         """Send the media player the command for muting the volume."""
-        await self.mqtt_client.async_publish_cmd(
-            PHONIEBOX_CMD_MUTE, bool_to_string(mute)
+        await self._async_publish_optimistic(
+            PHONIEBOX_ATTR_MUTE, mute, PHONIEBOX_CMD_MUTE, bool_to_string(mute)
         )
 
     @override
     async def async_media_play(self) -> None:
         """Send play command."""
-        await self.mqtt_client.async_publish_cmd(PHONIEBOX_CMD_PLAYER_PLAY, None)
+        await self._async_publish_optimistic(
+            PHONIEBOX_ATTR_STATE,
+            MediaPlayerState.PLAYING,
+            PHONIEBOX_CMD_PLAYER_PLAY,
+            None,
+        )
 
     @override
     async def async_media_pause(self) -> None:
         """Send pause command."""
-        await self.mqtt_client.async_publish_cmd(PHONIEBOX_CMD_PLAYER_PAUSE, None)
+        await self._async_publish_optimistic(
+            PHONIEBOX_ATTR_STATE,
+            MediaPlayerState.PAUSED,
+            PHONIEBOX_CMD_PLAYER_PAUSE,
+            None,
+        )
 
     @override
     async def async_media_stop(self) -> None:
@@ -238,8 +441,11 @@ class PhonieboxMediaPlayer(PhonieboxEntity, MediaPlayerEntity, ABC):
     @override
     async def async_set_shuffle(self, shuffle: bool) -> None:
         """Enable/disable shuffle mode."""
-        await self.mqtt_client.async_publish_cmd(
-            PHONIEBOX_CMD_PLAYER_SHUFFLE, bool_to_string(shuffle)
+        await self._async_publish_optimistic(
+            PHONIEBOX_ATTR_RANDOM,
+            shuffle,
+            PHONIEBOX_CMD_PLAYER_SHUFFLE,
+            bool_to_string(shuffle),
         )
 
     @override
@@ -257,8 +463,12 @@ class PhonieboxMediaPlayer(PhonieboxEntity, MediaPlayerEntity, ABC):
     @override
     async def async_set_volume_level(self, volume: float) -> None:
         """Set volume level, range 0..1."""
-        await self.mqtt_client.async_publish_cmd(
-            PHONIEBOX_CMD_SET_VOLUME, parse_int_save(volume * 100)
+        volume_percent = parse_int_save(volume * 100)
+        await self._async_publish_optimistic(
+            PHONIEBOX_ATTR_VOLUME,
+            volume_percent / 100.0,
+            PHONIEBOX_CMD_SET_VOLUME,
+            volume_percent,
         )
 
     async def async_set_volume_steps(self, volume_steps: int) -> None:
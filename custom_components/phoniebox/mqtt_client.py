@@ -1,36 +1,104 @@
 # mypy: disable-error-code="attr-defined, unused-coroutine"
 """Creates the mqtt client."""
 
-from collections.abc import Callable, Coroutine
+from collections.abc import Callable, Coroutine, Iterable, Mapping
 from typing import Any
 
 from homeassistant.components import mqtt
 from homeassistant.components.mqtt.models import PublishPayloadType, ReceiveMessage
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 
-from custom_components.phoniebox.const import LOGGER
+from custom_components.phoniebox.command_queue import CommandQueue, OfflineBuffer
+from custom_components.phoniebox.const import (
+    COMMAND_ATTRIBUTES,
+    COMMAND_RATE_LIMIT_POLICIES,
+    COMMANDS_LAST_WRITE_WINS,
+    LOGGER,
+    OFFLINE_BUFFER_COALESCE_KEYS,
+    OFFLINE_BUFFER_SIZE,
+    OFFLINE_BUFFER_TTL,
+    OFFLINE_BUFFER_TTLS,
+    ROUND_TRIP_TIMEOUT,
+    ROUND_TRIP_WINDOW,
+)
+from custom_components.phoniebox.descriptors import COMMAND_TOPIC_PREFIX
+from custom_components.phoniebox.latency import RoundTripTracker
 
 
 class MqttClient:
     """MQTT Client to communicate with Phoniebox."""
 
-    def __init__(self, hass: HomeAssistant, base_topic: str) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        base_topic: str,
+        last_write_wins: Iterable[str] = COMMANDS_LAST_WRITE_WINS,
+        rate_limit_policies: Mapping[str, str] = COMMAND_RATE_LIMIT_POLICIES,
+    ) -> None:
         """Init of the client."""
         self.base_topic = base_topic
         self.hass = hass
+        # Unsubscribe callables of all live subscriptions
+        self._subscriptions: list[CALLBACK_TYPE] = []
+        # Publishes the commands of the box in order, holding them back while
+        # the box is offline
+        self.commands = CommandQueue(
+            hass,
+            self._async_publish_cmd,
+            last_write_wins,
+            rate_limit_policies,
+            OfflineBuffer(
+                hass.loop.time,
+                max_size=OFFLINE_BUFFER_SIZE,
+                ttl=OFFLINE_BUFFER_TTL,
+                ttls=OFFLINE_BUFFER_TTLS,
+                coalesce_keys=OFFLINE_BUFFER_COALESCE_KEYS,
+            ),
+        )
+        # Time from publishing a command until the box reports its effect
+        self.round_trips = RoundTripTracker(
+            hass.loop.time, COMMAND_ATTRIBUTES, ROUND_TRIP_TIMEOUT, ROUND_TRIP_WINDOW
+        )
+
+    @property
+    def subscription_count(self) -> int:
+        """Return the number of live subscriptions."""
+        return len(self._subscriptions)
 
     async def async_subscribe(
         self,
         topic: str,
         msg_callback: Callable[[ReceiveMessage], Coroutine[Any, Any, None] | None],
-    ) -> None:
+    ) -> CALLBACK_TYPE:
         """
         Subscribe to the given topic.
 
-        Adds the base_topic to the provided topic for convenience.
+        Adds the base_topic to the provided topic for convenience. The
+        subscription is tracked until it is released through the returned
+        callable or async_unsubscribe_all.
         """
         full_topic = f"{self.base_topic}/{topic}"
-        await mqtt.async_subscribe(self.hass, full_topic, msg_callback)
+        unsubscribe = await mqtt.async_subscribe(self.hass, full_topic, msg_callback)
+        self._subscriptions.append(unsubscribe)
+
+        @callback
+        def async_unsubscribe() -> None:
+            if unsubscribe in self._subscriptions:
+                self._subscriptions.remove(unsubscribe)
+                unsubscribe()
+
+        return async_unsubscribe
+
+    @callback
+    def async_unsubscribe_all(self) -> None:
+        """Release all subscriptions of this client."""
+        LOGGER.debug(
+            "Releasing %(count)d subscriptions of %(topic)s",
+            {"count": len(self._subscriptions), "topic": self.base_topic},
+        )
+        subscriptions, self._subscriptions = self._subscriptions, []
+        for unsubscribe in subscriptions:
+            unsubscribe()
 
     async def async_publish(self, topic: str, payload: PublishPayloadType) -> None:
         """Publish message to a MQTT topic for phoniebox."""
@@ -39,8 +107,13 @@ class MqttClient:
         await mqtt.async_publish(self.hass, full_topic, payload)
 
     async def async_publish_cmd(self, topic: str, payload: PublishPayloadType) -> None:
-        """Send a command to phoniebox."""
-        await self.async_publish(f"cmd/{topic}", payload)
+        """Send a command to phoniebox through the command queue."""
+        await self.commands.async_put(topic, payload)
+
+    async def _async_publish_cmd(self, topic: str, payload: PublishPayloadType) -> None:
+        """Publish a command taken from the command queue."""
+        self.round_trips.async_command_sent(topic)
+        await self.async_publish(f"{COMMAND_TOPIC_PREFIX}{topic}", payload)
 
 
 __all__ = ["MqttClient"]
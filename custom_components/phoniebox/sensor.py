@@ -5,32 +5,39 @@ from collections.abc import Callable
 from dataclasses import dataclass
 from typing import Any
 
-from homeassistant.components.mqtt.models import ReceiveMessage
-from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTemperature
+from homeassistant.const import (
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfTemperature,
+    UnitOfTime,
+)
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import (
-    BOOLEAN_SENSORS,
+    COMMAND_LATENCY_PERCENTILES,
     CONF_PHONIEBOX_NAME,
-    DIAGNOSTIC_SENSORS,
     DOMAIN,
-    GIGABYTE_SENSORS,
-    IGNORE_SENSORS,
     LOGGER,
-    STRING_SENSORS,
-    TOPIC_DOMAIN_FILE,
-    TOPIC_DOMAIN_STATE,
-    TOPIC_DOMAIN_TEMPERATUR,
+    SENSOR,
     TOPIC_DOMAIN_VERSION,
-    TOPIC_LENGTH_GENERIC_STATE,
-    TOPIC_LENGTH_PLAYER_STATE,
 )
-from .data_coordinator import DataCoordinator
+from .data_coordinator import DataCoordinator, PhonieboxMessage
+from .descriptors import keys_for_platform
 from .entity import PhonieboxEntity
-from .utils import create_entity_slug, create_mqtt_context, handle_mqtt_entity_by_type
+from .utils import (
+    EntityAddBatcher,
+    create_entity_slug,
+    create_mqtt_context,
+    handle_mqtt_entity_by_type,
+    update_discovered_entity,
+)
 
 
 @dataclass
@@ -38,7 +45,7 @@ class SensorData:
     """Button Data."""
 
     name: str
-    units: UnitOfInformation | UnitOfTemperature | None
+    units: UnitOfInformation | UnitOfTemperature | str | None
     entity_category: EntityCategory | None = None
     icon: str | None = None
     device_class: SensorDeviceClass | None = None
@@ -67,174 +74,134 @@ class GenericPhonieboxSensor(PhonieboxEntity, SensorEntity):  # pylint: disable=
         self.extract_value = data.extract_value
         self._attr_entity_category = data.entity_category
 
-    def set_state(self, *, value: bool) -> None:  # noqa: ARG002 # pylint: disable=unused-argument
+    def set_state(self, *, value: bool) -> bool:  # noqa: ARG002 # pylint: disable=unused-argument
         """Update the sensor with the most recent event."""
-        return
+        return False
 
-    def set_event(self, event: Any) -> None:
-        """Update the sensor with the most recent event."""
+    def set_event(self, event: Any) -> bool:
+        """
+        Update the sensor with the most recent event.
+
+        Returns True if the native value changed.
+        """
         value = event
         if self.extract_value is not None:
             value = self.extract_value(event)
         if self._attr_native_value == value:
-            return
+            return False
 
         LOGGER.debug(
             "Updating sensor %(name)s to -> %(value)s",
             {"name": self.name, "value": value},
         )
         self._attr_native_value = value
+        return True
 
 
-def is_player_state(domain: str, parts: list[str]) -> bool:
-    """WIll check if received topic is player state update."""
-    return domain == TOPIC_DOMAIN_STATE and len(parts) == TOPIC_LENGTH_PLAYER_STATE
+class CommandLatencySensor(PhonieboxEntity, SensorEntity):
+    """A percentile of the command round trips of the phoniebox."""
 
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
 
-def is_generic_state(domain: str, parts: list[str]) -> bool:
-    """WIll check if received topic is a normal state update."""
-    return domain == TOPIC_DOMAIN_STATE and len(parts) == TOPIC_LENGTH_GENERIC_STATE
+    def __init__(
+        self, config_entry: ConfigEntry, coordinator: DataCoordinator, percentile: int
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(config_entry, coordinator)
+        self._attr_name = f"command latency p{percentile}"
+        self.entity_id = _slug(self._attr_name, config_entry.data[CONF_PHONIEBOX_NAME])
+        self._percentile = percentile
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the percentile in milliseconds, None before any round trip."""
+        return self.mqtt_client.round_trips.histogram.percentile(self._percentile)
+
+    async def async_added_to_hass(self) -> None:
+        """Write the state after each round trip."""
+        self.async_on_remove(
+            self.mqtt_client.round_trips.async_add_listener(self.async_schedule_flush)
+        )
 
 
-def discover_sensors(  # noqa: PLR0911 # pylint: disable=too-many-return-statements
-    topic: str,
-    payload: Any,
+def discover_sensors(
+    message: PhonieboxMessage,
     entry: Any,
     coordinator: Any,
 ) -> GenericPhonieboxSensor | None:
     """
-    Given a topic, dynamically create the right sensor type.
+    Given a parsed message, create the sensor its descriptor describes.
 
     Async friendly.
     """
-    parts = topic.split("/")
-    domain = parts[2] if len(parts) == TOPIC_LENGTH_PLAYER_STATE else parts[1]
-
-    if domain in IGNORE_SENSORS or domain in BOOLEAN_SENSORS:
+    descriptor = message.descriptor
+    if SENSOR not in descriptor.platforms:
         return None
 
-    entity_category = (
-        EntityCategory.DIAGNOSTIC if domain in DIAGNOSTIC_SENSORS else None
+    return GenericPhonieboxSensor(
+        config_entry=entry,
+        coordinator=coordinator,
+        data=SensorData(
+            name=descriptor.name,
+            units=descriptor.unit,
+            entity_category=descriptor.entity_category,
+            device_class=descriptor.device_class,
+            extract_value=descriptor.sensor_value,
+        ),
     )
 
-    if domain == TOPIC_DOMAIN_TEMPERATUR:
-
-        def temp_string_to_float(temp_str: str) -> float:
-            return float(temp_str.split("'")[0])
-
-        return GenericPhonieboxSensor(
-            config_entry=entry,
-            coordinator=coordinator,
-            data=SensorData(
-                name=domain,
-                entity_category=entity_category,
-                units=UnitOfTemperature.CELSIUS,
-                device_class=SensorDeviceClass.TEMPERATURE,
-                extract_value=temp_string_to_float,
-            ),
-        )
-
-    if domain in GIGABYTE_SENSORS:
-        return GenericPhonieboxSensor(
-            config_entry=entry,
-            coordinator=coordinator,
-            data=SensorData(
-                name=domain,
-                units=UnitOfInformation.GIGABYTES,
-                entity_category=entity_category,
-            ),
-        )
-
-    if is_generic_state(domain, parts):
-        return GenericPhonieboxSensor(
-            config_entry=entry,
-            coordinator=coordinator,
-            data=SensorData(
-                name="state",
-                units=None,
-                entity_category=entity_category,
-            ),
-        )
-    if is_player_state(domain, parts):
-        return GenericPhonieboxSensor(
-            config_entry=entry,
-            coordinator=coordinator,
-            data=SensorData(
-                name="player state",
-                units=None,
-                entity_category=entity_category,
-            ),
-        )
-
-    if domain == TOPIC_DOMAIN_FILE:
-
-        def find_source(file: str) -> str:
-            return file.split(":")[0]
-
-        return GenericPhonieboxSensor(
-            config_entry=entry,
-            coordinator=coordinator,
-            data=SensorData(
-                name="source",
-                units=None,
-                extract_value=find_source,
-                entity_category=entity_category,
-            ),
-        )
-
-    if domain == TOPIC_DOMAIN_VERSION:
-        coordinator.version = payload
-
-    if domain in STRING_SENSORS:
-        return GenericPhonieboxSensor(
-            config_entry=entry,
-            coordinator=coordinator,
-            data=SensorData(
-                name=domain,
-                units=None,
-                entity_category=entity_category,
-            ),
-        )
-
-    return None
-
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set the sensor platform up."""
     coordinator: DataCoordinator = hass.data[DOMAIN][entry.entry_id]
+    # Topic -> sensor, resolved once on the first message of a topic
+    discovered: dict[str, GenericPhonieboxSensor | None] = {}
+    add_entities = EntityAddBatcher(hass, async_add_entities)
 
     @callback
-    def received_msg(msg: ReceiveMessage) -> None:
-        sensors = discover_sensors(msg.topic, msg.payload, entry, coordinator)
+    def received_msg(msg: PhonieboxMessage) -> None:
+        if msg.attribute == TOPIC_DOMAIN_VERSION:
+            coordinator.version = msg.value
+
+        if update_discovered_entity(
+            discovered, msg.topic, hass, msg.value, is_event_based=True
+        ):
+            return
+
+        sensor = discover_sensors(msg, entry, coordinator)
         store = coordinator.sensors
+        discovered[msg.topic] = None
 
-        if not sensors:
+        if sensor is None or not isinstance(sensor.name, str):
             return
 
-        sensor_list = (
-            (sensors,) if isinstance(sensors, GenericPhonieboxSensor) else sensors
+        context = create_mqtt_context(
+            entity=sensor,
+            store=store,
+            hass=hass,
+            msg_payload=msg.value,
+            async_add_entities_callback=add_entities,
         )
-
-        for sensor in sensor_list:
-            if not isinstance(sensor.name, str):
-                continue
-
-            context = create_mqtt_context(
-                entity=sensor,
-                store=store,
-                hass=hass,
-                msg_payload=msg.payload,
-                async_add_entities_callback=async_add_entities,
-            )
-            handle_mqtt_entity_by_type(
-                entity_type="sensor",
-                context=context,
-                debug_logger=LOGGER,
-            )
-
-    await coordinator.mqtt_client.async_subscribe("#", received_msg)
+        handle_mqtt_entity_by_type(
+            entity_type="sensor",
+            context=context,
+            debug_logger=LOGGER,
+        )
+        # The store is shared by the sensor platforms
+        if isinstance(entity := store[sensor.name], GenericPhonieboxSensor):
+            discovered[msg.topic] = entity
+
+    coordinator.async_add_listener(SENSOR, keys_for_platform(SENSOR), received_msg)
+    async_add_entities(
+        CommandLatencySensor(entry, coordinator, percentile)
+        for percentile in COMMAND_LATENCY_PERCENTILES
+    )
 
 
 def _slug(name: str, phoniebox_name: str) -> str:
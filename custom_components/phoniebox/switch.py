@@ -8,65 +8,51 @@ from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.entity import EntityCategory
 
 from .const import (
-    BINARY_SWITCHES,
     CONF_PHONIEBOX_NAME,
     DOMAIN,
     LOGGER,
-    PHONIEBOX_ATTR_GPIO,
-    PHONIEBOX_ATTR_RFID,
-    PHONIEBOX_START,
-    PHONIEBOX_STOP,
-    TOPIC_DOMAIN_RANDOM,
-    TOPIC_LENGTH_PLAYER_STATE,
+    SWITCH,
 )
+from .descriptors import keys_for_platform
 from .entity import PhonieboxEntity
-from .utils import create_entity_slug, create_mqtt_context, handle_mqtt_entity_by_type
+from .utils import (
+    EntityAddBatcher,
+    create_entity_slug,
+    create_mqtt_context,
+    handle_mqtt_entity_by_type,
+    update_discovered_entity,
+)
 
 if TYPE_CHECKING:
-    from homeassistant.components.mqtt.models import ReceiveMessage
     from homeassistant.config_entries import ConfigEntry
+    from homeassistant.helpers.entity import EntityCategory
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-    from .data_coordinator import DataCoordinator
+    from .data_coordinator import DataCoordinator, PhonieboxMessage
 
 
 def discover_sensors(
-    topic: str, entry: ConfigEntry, coordinator: DataCoordinator
+    message: PhonieboxMessage, entry: ConfigEntry, coordinator: DataCoordinator
 ) -> PhonieboxBinarySwitch | None:
-    """Based on the topic and entry create the correct binary switch."""
-    parts = topic.split("/")
-    domain = parts[2] if len(parts) == TOPIC_LENGTH_PLAYER_STATE else parts[1]
+    """Based on the message and entry create the correct binary switch."""
+    descriptor = message.descriptor
+    command = descriptor.switch
 
-    if domain not in BINARY_SWITCHES:
+    if command is None:
         return None
 
-    if domain in [PHONIEBOX_ATTR_GPIO, PHONIEBOX_ATTR_RFID]:
-        return PhonieboxBinarySwitch(
-            config_entry=entry,
-            coordinator=coordinator,
-            data=SwitchData(
-                name=domain,
-                mqtt_topic=domain,
-                mqtt_on_payload=PHONIEBOX_START,
-                mqtt_off_payload=PHONIEBOX_STOP,
-                entity_category=EntityCategory.CONFIG,
-            ),
-        )
-
-    if domain == TOPIC_DOMAIN_RANDOM:
-        return PhonieboxBinarySwitch(
-            config_entry=entry,
-            coordinator=coordinator,
-            data=SwitchData(name=domain, mqtt_topic="playershuffle"),
-        )
-
     return PhonieboxBinarySwitch(
         config_entry=entry,
         coordinator=coordinator,
-        data=SwitchData(name=domain, mqtt_topic=domain),
+        data=SwitchData(
+            name=descriptor.name,
+            mqtt_topic=command.topic,
+            mqtt_on_payload=command.on_payload,
+            mqtt_off_payload=command.off_payload,
+            entity_category=command.entity_category,
+        ),
     )
 
 
@@ -75,33 +61,36 @@ async def async_setup_entry(
 ) -> None:
     """Set binary_sensor platform up."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
+    # Topic -> switch, resolved once on the first message of a topic
+    discovered: dict[str, PhonieboxBinarySwitch | None] = {}
+    add_entities = EntityAddBatcher(hass, async_add_devices)
 
     @callback
-    def received_msg(msg: ReceiveMessage) -> None:
-        sensors = discover_sensors(msg.topic, entry, coordinator)
+    def received_msg(msg: PhonieboxMessage) -> None:
+        if update_discovered_entity(discovered, msg.topic, hass, msg.value):
+            return
+
+        sensor = discover_sensors(msg, entry, coordinator)
         store = coordinator.switches
+        discovered[msg.topic] = None
 
-        if not sensors:
+        if sensor is None:
             return
 
-        sensors_tuple = (
-            (sensors,) if isinstance(sensors, PhonieboxBinarySwitch) else sensors
+        context = create_mqtt_context(
+            entity=sensor,
+            store=store,
+            hass=hass,
+            msg_payload=msg.value,
+            async_add_entities_callback=add_entities,
         )
+        handle_mqtt_entity_by_type(
+            entity_type="switch",
+            context=context,
+        )
+        discovered[msg.topic] = store[sensor.name]
 
-        for sensor in sensors_tuple:
-            context = create_mqtt_context(
-                entity=sensor,
-                store=store,
-                hass=hass,
-                msg_payload=msg.payload,
-                async_add_entities_callback=async_add_devices,
-            )
-            handle_mqtt_entity_by_type(
-                entity_type="switch",
-                context=context,
-            )
-
-    await coordinator.mqtt_client.async_subscribe("#", received_msg)
+    coordinator.async_add_listener(SWITCH, keys_for_platform(SWITCH), received_msg)
 
 
 def _slug(name: str, phoniebox_name: str) -> str:
@@ -113,7 +102,7 @@ class SwitchData:
     """Button Data."""
 
     name: str
-    mqtt_topic: str | None = None
+    mqtt_topic: str
     mqtt_on_payload: str = ""
     mqtt_off_payload: str = ""
     entity_category: EntityCategory | None = None
@@ -133,34 +122,42 @@ class PhonieboxBinarySwitch(PhonieboxEntity, SwitchEntity, ABC):
         super().__init__(config_entry, coordinator)
         self.entity_id = _slug(data.name, config_entry.data[CONF_PHONIEBOX_NAME])
         self._attr_name = data.name
+        self._phoniebox_attribute = data.name
         self._name = "switch_" + data.name
         self._mqtt_on_payload = data.mqtt_on_payload
         self._mqtt_off_payload = data.mqtt_off_payload
         self._mqtt_topic = data.mqtt_topic
         self._attr_entity_category = data.entity_category
 
-    def set_state(self, *, value: bool) -> None:
-        """Update the binary sensor with the most recent value."""
+    def set_state(self, *, value: bool) -> bool:
+        """
+        Update the binary sensor with the most recent value.
+
+        Returns True if the state changed.
+        """
         if self._attr_is_on == value:
-            return
+            return False
         LOGGER.debug(
             "Updating switch %(name)s to -> %(value)s",
             {"name": self.name, "value": value},
         )
         self._attr_is_on = value
+        return True
 
     async def async_turn_on(self, **kwargs: Any) -> None:  # noqa: ARG002
         """Turn the entity on."""
-        await self.mqtt_client.async_publish(
-            f"cmd/{self._mqtt_topic}", self._mqtt_on_payload
+        await self.mqtt_client.async_publish_cmd(
+            self._mqtt_topic, self._mqtt_on_payload
         )
+        self.coordinator.async_forget_payload(self._phoniebox_attribute)
         self.set_state(value=True)
         self.async_schedule_update_ha_state()
 
     async def async_turn_off(self, **kwargs: Any) -> None:  # noqa: ARG002
         """Turn the entity on."""
-        await self.mqtt_client.async_publish(
-            f"cmd/{self._mqtt_topic}", self._mqtt_off_payload
+        await self.mqtt_client.async_publish_cmd(
+            self._mqtt_topic, self._mqtt_off_payload
         )
+        self.coordinator.async_forget_payload(self._phoniebox_attribute)
         self.set_state(value=False)
         self.async_schedule_update_ha_state()
@@ -1,10 +1,21 @@
 """Utility functions."""
 
+from __future__ import annotations
+
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
+from homeassistant.core import callback
 from homeassistant.util import slugify
 
+if TYPE_CHECKING:
+    from asyncio import Handle
+    from collections.abc import Iterable
+
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.entity import Entity
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
 
 @dataclass
 class MqttEntityConfig:  # pylint: disable=too-many-instance-attributes
@@ -31,6 +42,93 @@ class MqttContext:
     async_add_entities_callback: Any
 
 
+class EntityAddBatcher:
+    """
+    Collect entities discovered within one event loop iteration.
+
+    A broker replaying retained messages leads to many discoveries at once.
+    Instead of one async_add_entities call per entity, the batcher adds all
+    entities discovered in the same loop iteration with a single call. It has
+    the signature of AddEntitiesCallback so it can be used in its place.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, async_add_entities: AddEntitiesCallback
+    ) -> None:
+        """Init the batcher for a platform."""
+        self._hass = hass
+        self._async_add_entities = async_add_entities
+        self._pending: list[Entity] = []
+        self._flush_handle: Handle | None = None
+
+    @callback
+    def __call__(
+        self,
+        new_entities: Iterable[Entity],
+        update_before_add: bool = False,  # noqa: FBT001, FBT002, ARG002
+    ) -> None:
+        """Queue entities to be added at the end of this loop iteration."""
+        self._pending.extend(new_entities)
+        if self._flush_handle is None:
+            self._flush_handle = self._hass.loop.call_soon(self._async_flush)
+
+    @callback
+    def _async_flush(self) -> None:
+        """Add all queued entities in a single call."""
+        self._flush_handle = None
+        entities, self._pending = self._pending, []
+        if entities:
+            self._async_add_entities(entities)
+
+
+class StateFlushScheduler:
+    """
+    Write the state of changed entities once per event loop iteration.
+
+    A single message can change several entities and a reconnect burst
+    changes dozens. Entities mark themselves dirty instead of writing their
+    state, and all dirty entities of the config entry are written in one pass
+    at the end of the loop iteration, each of them at most once.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Init the scheduler for a config entry."""
+        self._hass = hass
+        self._dirty: dict[Entity, None] = {}
+        self._flush_handle: Handle | None = None
+        self.writes = 0
+        self.coalesced_writes = 0
+
+    @callback
+    def async_mark_dirty(self, entity: Entity) -> None:
+        """Write the state of the entity at the end of this loop iteration."""
+        if entity in self._dirty:
+            self.coalesced_writes += 1
+            return
+        self._dirty[entity] = None
+        if self._flush_handle is None:
+            self._flush_handle = self._hass.loop.call_soon(self.async_flush)
+
+    @callback
+    def async_flush(self) -> None:
+        """Write the state of all dirty entities."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        entities, self._dirty = self._dirty, {}
+        for entity in entities:
+            entity.async_write_ha_state()
+            self.writes += 1
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop pending writes, e.g. when the config entry is unloaded."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._dirty.clear()
+
+
 def string_to_bool(value: str) -> bool:
     """Boolean string to boolean converter."""
     return value == "true"
@@ -67,12 +165,14 @@ def ensure_entity_hass_and_update_state(
 
     This utility function prevents the 'Attribute hass is None' runtime error
     by ensuring the hass attribute is properly set before scheduling state updates.
+    If the payload did not change the entity, no state update is scheduled and
+    the suppressed write is counted on the coordinator.
 
     Args:
     ----
         entity: The entity to update
         hass: Home Assistant instance
-        payload: MQTT payload
+        payload: The payload as decoded by the codec
         is_event_based: Whether to use set_event (True) or set_state (False)
 
     """
@@ -80,12 +180,60 @@ def ensure_entity_hass_and_update_state(
     if entity.hass is None:
         entity.hass = hass
 
+    # Entities waiting for their batched registration write their state when
+    # they are added
+    pending = entity.platform is None
+
     if is_event_based:
-        entity.set_event(payload)
+        changed = entity.set_event(payload)
     else:
-        entity.set_state(value=string_to_bool(str(payload)))
+        changed = entity.set_state(value=payload)
+
+    if not changed:
+        entity.coordinator.suppressed_writes += 1
+        return
+
+    if not pending:
+        entity.coordinator.state_flush.async_mark_dirty(entity)
 
-    entity.async_schedule_update_ha_state()
+
+def update_discovered_entity(
+    discovered: dict[str, Any],
+    topic: str,
+    hass: Any,
+    payload: Any,
+    *,
+    is_event_based: bool = False,
+) -> bool:
+    """
+    Update the entity already discovered for a topic.
+
+    Known topics resolve straight to their entity, so no throwaway entity is
+    constructed for steady-state messages. Topics that were seen before but
+    did not yield an entity are cached as None and ignored.
+
+    Args:
+    ----
+        discovered: Cache of topic to entity (or None) filled on first sight
+        topic: The full MQTT topic of the message
+        hass: Home Assistant instance
+        payload: The payload as decoded by the codec
+        is_event_based: Whether to use set_event (True) or set_state (False)
+
+    Returns:
+    -------
+        True if the topic was handled from the cache, False if it is new
+
+    """
+    if topic not in discovered:
+        return False
+
+    entity = discovered[topic]
+    if entity is not None:
+        ensure_entity_hass_and_update_state(
+            entity, hass, payload, is_event_based=is_event_based
+        )
+    return True
 
 
 def create_entity_slug(entity_type: str, name: str, phoniebox_name: str) -> str:
@@ -180,16 +328,15 @@ def handle_mqtt_entity_discovery(config: MqttEntityConfig) -> None:
         if config.is_event_based:
             config.entity.set_event(config.payload)
         else:
-            config.entity.set_state(value=string_to_bool(str(config.payload)))
+            config.entity.set_state(value=config.payload)
         config.store[config.entity.name] = config.entity
         if config.debug_logger:
             config.debug_logger.debug(
                 "Registering %(entity_type)s %(name)s",
                 {"entity_type": config.entity_type_name, "name": config.entity.name},
             )
-        config.async_add_entities_callback(
-            new_entities=(config.entity,), update_before_add=True
-        )
+        # Entities are push-only, their state is already set from the payload
+        config.async_add_entities_callback(new_entities=(config.entity,))
     else:
         ensure_entity_hass_and_update_state(
             config.store[config.entity.name],
@@ -0,0 +1,138 @@
+"""
+Benchmark the payload codec against decoding per consumer.
+
+Before the codec every consumer of a topic stringified and parsed the raw
+payload itself, e.g. `mute` was parsed by the binary sensor, the switch and
+the media player. The codec decodes once at ingress and hands the typed value
+to all of them. Both strategies are measured on single topics and on a bulk
+state holding every attribute, with the same delivery to each consumer.
+
+Run with `scripts/benchmark`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from typing import TYPE_CHECKING, Any
+
+from custom_components.phoniebox.codec import as_text, decode
+from custom_components.phoniebox.descriptors import ATTRIBUTE_DESCRIPTORS
+from custom_components.phoniebox.utils import (
+    parse_float_save,
+    parse_int_save,
+    string_to_bool,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def _legacy_seconds(value: str) -> int:
+    return sum(
+        x * parse_int_save(t)
+        for x, t in zip([3600, 60, 1], value.split(":"), strict=False)
+    )
+
+
+# Topic -> (payload, decoders of each consumer before the codec)
+LEGACY_CONSUMERS: dict[str, tuple[Any, tuple[Callable[[str], Any], ...]]] = {
+    "attribute/mute": (
+        "true",
+        (string_to_bool, string_to_bool, string_to_bool),
+    ),
+    "attribute/random": ("false", (string_to_bool, string_to_bool)),
+    "attribute/volume": ("55", (lambda v: parse_float_save(v) / 100.0,)),
+    "attribute/elapsed": ("00:03:12", (_legacy_seconds,)),
+    "attribute/temperature": (
+        "45.6'C",
+        (lambda v: float(v.split("'")[0]),),
+    ),
+}
+
+
+# Value each consumer received last
+_received: dict[int, Any] = {}
+
+
+def _deliver(consumer: int, value: Any) -> None:
+    _received[consumer] = value
+
+
+def _legacy() -> None:
+    for payload, consumers in LEGACY_CONSUMERS.values():
+        for consumer, parse in enumerate(consumers):
+            _deliver(consumer, parse(str(payload)))
+
+
+def _codec() -> None:
+    for key, (payload, consumers) in LEGACY_CONSUMERS.items():
+        value = decode(ATTRIBUTE_DESCRIPTORS[key], payload)
+        for consumer in range(len(consumers)):
+            _deliver(consumer, value)
+
+
+# Attribute -> value of a bulk state, typed as JSON delivers it
+BULK_STATE: dict[str, Any] = {
+    "state": "play",
+    "volume": 40,
+    "maxvolume": 90,
+    "volstep": 5,
+    "mute": False,
+    "random": False,
+    "repeat": True,
+    "elapsed": "00:01:12",
+    "duration": "00:03:00",
+    "track": "3/12",
+    "title": "Song",
+    "artist": "Artist",
+    "album": "Album",
+    "albumartist": "Album Artist",
+    "file": "spotify:track:1",
+    "last_card": "1234",
+    "gpio": True,
+    "rfid": True,
+    "version": "2.2",
+    "edition": "classic",
+    "throttling": "0x0",
+    "temperature": "45.6'C",
+    "disk_avail": 10,
+    "disk_total": 32,
+}
+BULK_DESCRIPTORS = tuple(
+    (ATTRIBUTE_DESCRIPTORS[f"attribute/{attribute}"], value)
+    for attribute, value in BULK_STATE.items()
+)
+
+
+def _bulk_legacy() -> None:
+    for descriptor, payload in BULK_DESCRIPTORS:
+        for consumer, _platform in enumerate(descriptor.platforms):
+            _deliver(consumer, descriptor.parse(as_text(payload)))
+
+
+def _bulk_codec() -> None:
+    for descriptor, payload in BULK_DESCRIPTORS:
+        value = decode(descriptor, payload)
+        for consumer, _platform in enumerate(descriptor.platforms):
+            _deliver(consumer, value)
+
+
+def main() -> None:
+    """Print the time per message burst of both strategies."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for name, func in (
+        ("per consumer", _legacy),
+        ("codec", _codec),
+        ("bulk per consumer", _bulk_legacy),
+        ("bulk codec", _bulk_codec),
+    ):
+        best = min(timeit.repeat(func, number=args.number, repeat=5))
+        print(f"{name:>17}: {best / args.number * 1e9:8.0f} ns per burst")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,7 @@ from typing import Any
 from unittest.mock import MagicMock, patch
 
 import pytest
+from homeassistant.config_entries import ConfigEntryState
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import entity_registry
 from homeassistant.helpers.entity_registry import RegistryEntry
@@ -103,6 +104,12 @@ def media_player_entry(hass: HomeAssistant) -> RegistryEntry | None:
 async def cleanup_timers(hass: HomeAssistant) -> AsyncGenerator[None, None]:
     """Cancel all lingering timers."""
     yield
+    # Unload the entries first, releasing their subscriptions schedules the
+    # MQTT unsubscribe cooldown
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if entry.state is ConfigEntryState.LOADED:
+            await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
     # ruff: noqa: SLF001
     for timer in list(hass.loop._scheduled):
         timer.cancel()
@@ -10,6 +10,8 @@ from pytest_homeassistant_custom_component.common import (
     async_fire_mqtt_message,
 )
 
+from custom_components.phoniebox.const import DOMAIN
+
 if TYPE_CHECKING:
     from homeassistant.helpers.entity_registry import RegistryEntry
 
@@ -59,3 +61,29 @@ async def test_sensor_registry_update(
     version_sensor_state = hass.states.get("binary_sensor.phoniebox_test_box_gpio")
     assert version_sensor_state is not None
     assert version_sensor_state.state == STATE_OFF
+
+
+async def test_unchanged_payload_writes_no_state(
+    hass: HomeAssistant, mock_phoniebox: MockConfigEntry, config: dict
+) -> None:
+    """Test that a repeated payload is dropped before it writes a state."""
+    coordinator = hass.data[DOMAIN][mock_phoniebox.entry_id]
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/gpio", "true")
+    await hass.async_block_till_done()
+    state = hass.states.get("binary_sensor.phoniebox_test_box_gpio")
+    assert state is not None
+    writes = coordinator.state_flush.writes
+
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/gpio", "true")
+    await hass.async_block_till_done()
+    assert coordinator.duplicate_hits == 1
+    assert coordinator.state_flush.writes == writes
+    unchanged_state = hass.states.get("binary_sensor.phoniebox_test_box_gpio")
+    assert unchanged_state is not None
+    assert unchanged_state.last_updated == state.last_updated
+
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/gpio", "false")
+    await hass.async_block_till_done()
+    state = hass.states.get("binary_sensor.phoniebox_test_box_gpio")
+    assert state is not None
+    assert state.state == STATE_OFF
@@ -0,0 +1,91 @@
+"""Tests for the payload codec."""
+
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_mqtt_message,
+)
+
+from custom_components.phoniebox import data_coordinator
+from custom_components.phoniebox.codec import (
+    as_text,
+    decode,
+    decode_max_volume,
+    decode_seconds,
+    decode_temperature,
+    decode_track,
+)
+from custom_components.phoniebox.descriptors import (
+    ATTRIBUTE_DESCRIPTORS,
+    AttributeDescriptor,
+)
+
+
+def test_as_text() -> None:
+    """Test that raw payloads are turned into text."""
+    assert as_text("play") == "play"
+    assert as_text(b"play") == "play"
+    assert as_text(42) == "42"
+
+
+def test_decoders() -> None:
+    """Test the typed decoders."""
+    assert decode_seconds("00:01:05") == 65
+    assert decode_seconds("01:00") == 3600
+    assert decode_track("3/12") == 3
+    assert decode_temperature("45.6'C") == 45.6
+    assert decode_temperature("n/a") == 0.0
+    assert decode_max_volume("") == 100
+
+
+def test_decode_with_descriptor() -> None:
+    """Test decoding the payload of a topic with its descriptor."""
+    assert decode(ATTRIBUTE_DESCRIPTORS["attribute/mute"], b"true") is True
+    assert decode(ATTRIBUTE_DESCRIPTORS["attribute/volume"], "55") == 55.0
+    assert decode(ATTRIBUTE_DESCRIPTORS["attribute/elapsed"], "00:00:42") == 42
+
+
+async def test_payload_decoded_once(
+    hass: HomeAssistant, mock_phoniebox: MockConfigEntry
+) -> None:
+    """Test that a payload consumed by several platforms is decoded once."""
+    with patch.object(
+        data_coordinator, "decode", wraps=data_coordinator.decode
+    ) as mock_decode:
+        async_fire_mqtt_message(hass, "test_phoniebox/attribute/mute", "true")
+        await hass.async_block_till_done()
+        await hass.async_block_till_done()
+
+    assert mock_decode.call_count == 1
+    assert hass.states.get("binary_sensor.phoniebox_test_box_mute").state == "on"
+    assert hass.states.get("switch.phoniebox_test_box_mute").state == "on"
+    media_player = hass.states.get("media_player.phoniebox_test_box")
+    assert media_player.attributes["is_volume_muted"] is True
+
+
+async def test_malformed_payload_does_not_stop_ingress(
+    hass: HomeAssistant, mock_phoniebox: MockConfigEntry
+) -> None:
+    """Test that the messages queued after a malformed payload are ingested."""
+
+    def failing_decode(descriptor: AttributeDescriptor, payload: Any) -> Any:
+        if payload == "broken":
+            raise ValueError(payload)
+        return decode(descriptor, payload)
+
+    # Without a budget all messages wait for the drain task
+    with (
+        patch.object(data_coordinator, "INGRESS_CHUNK_BUDGET", 0),
+        patch.object(data_coordinator, "decode", side_effect=failing_decode),
+    ):
+        async_fire_mqtt_message(hass, "test_phoniebox/attribute/version", "broken")
+        async_fire_mqtt_message(hass, "test_phoniebox/attribute/edition", "classic")
+        await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.phoniebox_test_box_version") is None
+    edition = hass.states.get("sensor.phoniebox_test_box_edition")
+    assert edition is not None
+    assert edition.state == "classic"
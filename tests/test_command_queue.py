@@ -0,0 +1,259 @@
+"""Tests for the command queue."""
+
+import asyncio
+from typing import Any
+from unittest.mock import MagicMock, call, patch
+
+import pytest
+from homeassistant.components.media_player import ATTR_MEDIA_VOLUME_LEVEL
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    SERVICE_MEDIA_PAUSE,
+    SERVICE_MEDIA_PLAY,
+    SERVICE_VOLUME_SET,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_mqtt_message,
+)
+
+from custom_components.phoniebox.command_queue import OfflineBuffer
+from custom_components.phoniebox.const import (
+    COMMANDS_NEVER_BUFFERED,
+    OFFLINE_BUFFER_COALESCE_KEYS,
+)
+from custom_components.phoniebox.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.phoniebox.mqtt_client import MqttClient
+
+
+async def test_commands_are_coalesced_in_order(hass: HomeAssistant) -> None:
+    """Test that setters are coalesced while other commands keep their order."""
+    published: list[tuple[str, Any]] = []
+    release = asyncio.Event()
+
+    async def slow_publish(_hass: HomeAssistant, topic: str, payload: Any) -> None:
+        # The box is busy with the first command until released
+        if not published:
+            published.append((topic, payload))
+            await release.wait()
+            return
+        published.append((topic, payload))
+
+    client = MqttClient(hass, "box")
+    with patch(
+        "custom_components.phoniebox.mqtt_client.mqtt.async_publish",
+        side_effect=slow_publish,
+    ):
+        sent = [
+            hass.async_create_task(client.async_publish_cmd(command, payload))
+            for command, payload in (
+                ("setvolume", "10"),
+                ("setvolume", "20"),
+                ("setvolume", "30"),
+                ("playerplay", None),
+                ("swipecard", "1234"),
+                ("swipecard", "1234"),
+                ("playerseek", "+10"),
+            )
+        ]
+        await asyncio.sleep(0)
+        assert len(client.commands) == 5
+
+        release.set()
+        await asyncio.gather(*sent)
+
+    assert published == [
+        ("box/cmd/setvolume", "10"),
+        ("box/cmd/setvolume", "30"),
+        ("box/cmd/playerplay", None),
+        ("box/cmd/swipecard", "1234"),
+        ("box/cmd/swipecard", "1234"),
+        ("box/cmd/playerseek", "+10"),
+    ]
+    metrics = client.commands.as_dict()
+    assert metrics["depth"] == 0
+    assert metrics["coalesced"] == 1
+    assert metrics["published"] == 6
+    assert metrics["max_latency"] >= metrics["mean_latency"] >= 0
+
+
+async def test_coalescing_keeps_command_order(hass: HomeAssistant) -> None:
+    """Test that a setter is not coalesced across a command sent before it."""
+    published: list[tuple[str, Any]] = []
+    release = asyncio.Event()
+
+    async def slow_publish(_hass: HomeAssistant, topic: str, payload: Any) -> None:
+        published.append((topic, payload))
+        if len(published) == 1:
+            await release.wait()
+
+    client = MqttClient(hass, "box")
+    with patch(
+        "custom_components.phoniebox.mqtt_client.mqtt.async_publish",
+        side_effect=slow_publish,
+    ):
+        sent = [
+            hass.async_create_task(client.async_publish_cmd(command, payload))
+            for command, payload in (
+                ("playerplay", None),
+                ("setvolume", "10"),
+                ("playerpause", None),
+                ("setvolume", "20"),
+            )
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(*sent)
+
+    assert published == [
+        ("box/cmd/playerplay", None),
+        ("box/cmd/setvolume", "10"),
+        ("box/cmd/playerpause", None),
+        ("box/cmd/setvolume", "20"),
+    ]
+    assert client.commands.coalesced == 0
+
+
+async def test_failed_publish_reaches_caller(hass: HomeAssistant) -> None:
+    """Test that a failing publish raises for its caller only."""
+    client = MqttClient(hass, "box")
+    with patch(
+        "custom_components.phoniebox.mqtt_client.mqtt.async_publish",
+        side_effect=[RuntimeError("not connected"), None],
+    ):
+        with pytest.raises(RuntimeError):
+            await client.async_publish_cmd("playerplay", None)
+        await client.async_publish_cmd("playerpause", None)
+
+    assert client.commands.as_dict()["published"] == 1
+
+
+async def test_rate_limit_delays_commands(hass: HomeAssistant) -> None:
+    """Test that the sustained rate of commands stays within the limit."""
+    published: list[float] = []
+
+    async def timed_publish(_hass: HomeAssistant, topic: str, payload: Any) -> None:
+        published.append(hass.loop.time())
+
+    client = MqttClient(hass, "box")
+    client.commands.async_set_rate_limit(50, 2)
+    with patch(
+        "custom_components.phoniebox.mqtt_client.mqtt.async_publish",
+        side_effect=timed_publish,
+    ):
+        await asyncio.gather(
+            *(client.async_publish_cmd("swipecard", str(card)) for card in range(12))
+        )
+
+    assert len(published) == 12
+    # The burst is published at once, the rest at no more than 50 per second
+    sustained = published[2:]
+    rate = (len(sustained) - 1) / (sustained[-1] - sustained[0])
+    assert rate <= 50 * 1.05
+    assert client.commands.throttled > 0
+    assert client.commands.rejected == 0
+
+
+async def test_rate_limit_rejects_volume_steps(hass: HomeAssistant) -> None:
+    """Test that volume steps exceeding the limit are dropped."""
+    client = MqttClient(hass, "box")
+    client.commands.async_set_rate_limit(0.1, 2)
+    with patch(
+        "custom_components.phoniebox.mqtt_client.mqtt.async_publish"
+    ) as mock_publish:
+        results = await asyncio.gather(
+            *(client.async_publish_cmd("volumeup", None) for _ in range(5)),
+            return_exceptions=True,
+        )
+
+    assert [isinstance(result, HomeAssistantError) for result in results] == [
+        False,
+        False,
+        True,
+        True,
+        True,
+    ]
+    assert mock_publish.call_count == 2
+    assert client.commands.throttled == 3
+    assert client.commands.rejected == 3
+
+
+def test_offline_buffer_expires_and_coalesces() -> None:
+    """Test the time-to-live, coalescing and size of the offline buffer."""
+    now = 0.0
+    buffer = OfflineBuffer(
+        lambda: now,
+        max_size=3,
+        ttl=60,
+        ttls={"playerplay": 10, **dict.fromkeys(COMMANDS_NEVER_BUFFERED, 0)},
+        coalesce_keys=OFFLINE_BUFFER_COALESCE_KEYS,
+    )
+
+    assert not buffer.put("shutdown", None)
+    assert buffer.put("playerplay", None)
+    assert buffer.put("setvolume", 10)
+    assert buffer.put("swipecard", "1234")
+    # Replaces the first volume and runs after the card
+    assert buffer.put("setvolume", 20)
+    now = 20.0
+    assert [queued.command for queued in buffer.take()] == ["swipecard", "setvolume"]
+    assert buffer.expired == 1
+    assert buffer.coalesced == 1
+
+    for card in range(5):
+        buffer.put("swipecard", str(card))
+    assert [queued.payload for queued in buffer.take()] == ["2", "3", "4"]
+    assert buffer.overflowed == 2
+    assert not buffer
+
+
+async def test_never_buffered_commands_are_published(hass: HomeAssistant) -> None:
+    """Test that commands which must not run late bypass the offline buffer."""
+    client = MqttClient(hass, "box")
+    client.commands.async_set_online(False)
+    with patch(
+        "custom_components.phoniebox.mqtt_client.mqtt.async_publish"
+    ) as mock_publish:
+        await client.async_publish_cmd("setvolume", 40)
+        await client.async_publish_cmd("shutdown", None)
+
+    mock_publish.assert_called_once_with(hass, "box/cmd/shutdown", None)
+    assert len(client.commands.offline_buffer) == 1
+
+
+async def test_offline_commands_are_flushed_when_online(
+    hass: HomeAssistant, mqtt_mock: MagicMock, mock_phoniebox: MockConfigEntry
+) -> None:
+    """Test that commands sent while offline are published once back online."""
+    entity_id = "media_player.phoniebox_test_box"
+    async_fire_mqtt_message(hass, "test_phoniebox/state", "offline")
+    await hass.async_block_till_done()
+
+    for volume in (0.3, 0.5):
+        await hass.services.async_call(
+            "media_player",
+            SERVICE_VOLUME_SET,
+            {ATTR_ENTITY_ID: entity_id, ATTR_MEDIA_VOLUME_LEVEL: volume},
+            blocking=True,
+        )
+    for service in (SERVICE_MEDIA_PLAY, SERVICE_MEDIA_PAUSE):
+        await hass.services.async_call(
+            "media_player", service, {ATTR_ENTITY_ID: entity_id}, blocking=True
+        )
+    mqtt_mock.async_publish.assert_not_called()
+
+    async_fire_mqtt_message(hass, "test_phoniebox/state", "online")
+    await hass.async_block_till_done()
+
+    assert mqtt_mock.async_publish.call_args_list == [
+        call("test_phoniebox/cmd/setvolume", "50", 0, False),
+        call("test_phoniebox/cmd/playerpause", None, 0, False),
+    ]
+    diagnostics = await async_get_config_entry_diagnostics(hass, mock_phoniebox)
+    assert diagnostics["offline_buffer"]["flushed"] == 2
+    assert diagnostics["offline_buffer"]["coalesced"] == 2
+    assert diagnostics["commands"]["online"]
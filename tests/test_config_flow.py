@@ -7,6 +7,7 @@ import pytest
 from homeassistant import config_entries
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResultType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.phoniebox.const import DOMAIN
 
@@ -51,3 +52,33 @@ async def test_successful_config_flow(hass: HomeAssistant, config: dict) -> None
     assert result["title"] == "test_box"
     assert result["data"] == config
     assert result["result"]
+
+
+async def test_options_flow(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> None:
+    """Test setting update intervals through the options flow."""
+    mock_config_entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(mock_config_entry.entry_id)
+    assert result["type"] == FlowResultType.FORM
+    assert result["step_id"] == "user"
+
+    schema = result["data_schema"]({})
+    assert schema["sensor"] is True
+    assert schema["min_update_interval_diagnostic"] == 0
+    assert schema["min_update_interval_temperature"] == 0
+    assert schema["ingestion_mode"] == "auto"
+    # The rate limit is off until enabled here
+    assert schema["command_rate"] == 0
+
+    schema.update(
+        {"min_update_interval_diagnostic": 60, "min_update_interval_temperature": 300}
+    )
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input=schema
+    )
+
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert mock_config_entry.options["min_update_interval_diagnostic"] == 60
+    assert mock_config_entry.options["min_update_interval_temperature"] == 300
@@ -0,0 +1,84 @@
+"""Tests for the attribute descriptors."""
+
+from homeassistant.const import EntityCategory
+
+from custom_components.phoniebox.const import (
+    BINARY_SENSOR,
+    MEDIA_PLAYER,
+    SENSOR,
+    SWITCH,
+)
+from custom_components.phoniebox.descriptors import (
+    ATTRIBUTE_DESCRIPTORS,
+    keys_for_platform,
+    topic_filters,
+    update_intervals,
+)
+
+
+def test_descriptor_keys_match_topics() -> None:
+    """Test that every descriptor is registered under its own topic."""
+    for key, descriptor in ATTRIBUTE_DESCRIPTORS.items():
+        assert key == descriptor.key
+        assert key.rsplit("/", maxsplit=1)[-1] == descriptor.attribute
+        assert descriptor.platforms
+
+
+def test_keys_for_platform() -> None:
+    """Test which topics the platforms consume."""
+    assert set(keys_for_platform(SWITCH)) == {
+        "attribute/gpio",
+        "attribute/rfid",
+        "attribute/mute",
+    }
+    assert "attribute/repeat" in keys_for_platform(BINARY_SENSOR)
+    assert "attribute/repeat" not in keys_for_platform(SENSOR)
+    assert "attribute/volume" not in keys_for_platform(SENSOR)
+    assert "state" in keys_for_platform(MEDIA_PLAYER)
+    assert "attribute/state" in keys_for_platform(SENSOR)
+
+
+def test_descriptor_parsing() -> None:
+    """Test that the descriptors parse the payloads of their topics."""
+    temperature = ATTRIBUTE_DESCRIPTORS["attribute/temperature"]
+    assert temperature.parse("45.6'C") == 45.6
+    assert temperature.entity_category == EntityCategory.DIAGNOSTIC
+
+    source = ATTRIBUTE_DESCRIPTORS["attribute/file"]
+    assert source.sensor_value is not None
+    assert source.sensor_value(source.parse("spotify:track")) == "spotify"
+    assert ATTRIBUTE_DESCRIPTORS["attribute/mute"].parse("true") is True
+
+    assert ATTRIBUTE_DESCRIPTORS["attribute/elapsed"].parse("01:02:03") == 3723
+
+    assert not ATTRIBUTE_DESCRIPTORS["attribute/last_card"].deduplicate
+
+
+def test_update_intervals() -> None:
+    """Test that attribute intervals win over category intervals."""
+    assert update_intervals({}) == {}
+    intervals = update_intervals(
+        {
+            "min_update_interval_diagnostic": 60,
+            "min_update_interval_temperature": 300,
+            "min_update_interval_disk_avail": 0,
+        }
+    )
+    assert intervals["attribute/temperature"] == 300
+    assert intervals["attribute/disk_avail"] == 60
+    assert intervals["attribute/version"] == 60
+    assert "attribute/volume" not in intervals
+
+
+def test_topic_filters() -> None:
+    """Test that the topic filters cover exactly the consumed topics."""
+    assert topic_filters((MEDIA_PLAYER, SENSOR, BINARY_SENSOR, SWITCH)) == (
+        "attribute/+",
+        "state",
+    )
+    assert topic_filters((SWITCH,)) == (
+        "attribute/gpio",
+        "attribute/mute",
+        "attribute/rfid",
+    )
+    assert topic_filters(()) == ()
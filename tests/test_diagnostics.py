@@ -0,0 +1,82 @@
+"""Tests for the Phoniebox diagnostics."""
+
+from types import SimpleNamespace
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_mqtt_message,
+)
+
+from custom_components.phoniebox.const import DOMAIN
+from custom_components.phoniebox.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+
+
+async def test_duplicate_payloads_are_dropped(
+    hass: HomeAssistant, mock_phoniebox: MockConfigEntry, config: dict
+) -> None:
+    """Test that identical republished payloads are counted as hits."""
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/version", "2.2")
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/version", "2.2")
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/version", "2.3")
+    await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, mock_phoniebox)
+    assert diagnostics["entry"]["data"] == config
+    assert diagnostics["ingress"]["duplicate_hits"] == 1
+    assert diagnostics["ingress"]["duplicate_misses"] == 2
+
+
+async def test_last_card_repeats_are_kept(
+    hass: HomeAssistant, mock_phoniebox: MockConfigEntry, config: dict
+) -> None:
+    """Test that swiping the same card twice is not dropped as duplicate."""
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/last_card", "1234")
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/last_card", "1234")
+    await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, mock_phoniebox)
+    assert diagnostics["ingress"]["duplicate_hits"] == 0
+
+
+async def test_state_writes_are_coalesced(
+    hass: HomeAssistant, mock_phoniebox: MockConfigEntry, config: dict
+) -> None:
+    """Test that an entity changed several times in a tick is written once."""
+    async_fire_mqtt_message(hass, "test_phoniebox/state", "online")
+    await hass.async_block_till_done()
+    before = await async_get_config_entry_diagnostics(hass, mock_phoniebox)
+
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/volume", "40")
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/volume", "45")
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/title", "Song")
+    await hass.async_block_till_done()
+
+    after = await async_get_config_entry_diagnostics(hass, mock_phoniebox)
+    written = after["ingress"]["state_writes"] - before["ingress"]["state_writes"]
+    coalesced = (
+        after["ingress"]["coalesced_writes"] - before["ingress"]["coalesced_writes"]
+    )
+    assert written == 1
+    assert coalesced == 2
+    state = hass.states.get("media_player.phoniebox_test_box")
+    assert state is not None
+    assert state.attributes["volume_level"] == 0.45
+    assert state.attributes["media_title"] == "Song"
+
+
+async def test_command_echoes_are_dropped(
+    hass: HomeAssistant, mock_phoniebox: MockConfigEntry, config: dict
+) -> None:
+    """Test that commands echoed back by the broker are counted and dropped."""
+    coordinator = hass.data[DOMAIN][mock_phoniebox.entry_id]
+    for volume in ("10", "20", "30"):
+        coordinator.async_route_message(
+            SimpleNamespace(topic="test_phoniebox/cmd/setvolume", payload=volume)
+        )
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, mock_phoniebox)
+    assert diagnostics["ingress"]["command_echoes"] == 3
+    assert diagnostics["ingress"]["duplicate_misses"] == 0
@@ -0,0 +1,238 @@
+"""Tests for the ingress queue."""
+
+from unittest.mock import patch
+
+from homeassistant.components.media_player import ATTR_MEDIA_POSITION
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import slugify
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_mqtt_message,
+)
+
+from custom_components.phoniebox.const import DOMAIN, MEDIA_PLAYER
+from custom_components.phoniebox.descriptors import (
+    ATTRIBUTE_DESCRIPTORS,
+    IngressPriority,
+)
+from custom_components.phoniebox.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.phoniebox.ingress import IngressQueue
+
+STATE = ATTRIBUTE_DESCRIPTORS["state"]
+VOLUME = ATTRIBUTE_DESCRIPTORS["attribute/volume"]
+TITLE = ATTRIBUTE_DESCRIPTORS["attribute/title"]
+ELAPSED = ATTRIBUTE_DESCRIPTORS["attribute/elapsed"]
+VERSION = ATTRIBUTE_DESCRIPTORS["attribute/version"]
+LAST_CARD = ATTRIBUTE_DESCRIPTORS["attribute/last_card"]
+
+
+def test_descriptor_priorities() -> None:
+    """Test that the topics are ranked as intended."""
+    assert STATE.priority == IngressPriority.STATE
+    assert ATTRIBUTE_DESCRIPTORS["attribute/state"].priority == IngressPriority.STATE
+    assert VOLUME.priority == IngressPriority.CONTROL
+    assert ATTRIBUTE_DESCRIPTORS["attribute/mute"].priority == IngressPriority.CONTROL
+    assert TITLE.priority == IngressPriority.METADATA
+    assert ELAPSED.priority == IngressPriority.BACKGROUND
+    assert VERSION.priority == IngressPriority.BACKGROUND
+
+
+def test_queue_orders_by_priority() -> None:
+    """Test that important messages leave the queue first."""
+    queue = IngressQueue(8)
+    queue.put("box/attribute/elapsed", ELAPSED, "00:00:01")
+    queue.put("box/attribute/title", TITLE, "Song")
+    queue.put("box/attribute/volume", VOLUME, "40")
+    queue.put("box/state", STATE, "online")
+
+    topics = []
+    while (pending := queue.pop()) is not None:
+        topics.append(pending[0])
+    assert topics == [
+        "box/state",
+        "box/attribute/volume",
+        "box/attribute/title",
+        "box/attribute/elapsed",
+    ]
+    assert not queue
+
+
+def test_queue_keeps_latest_payload_per_topic() -> None:
+    """Test that a topic waits once with its newest payload."""
+    queue = IngressQueue(8)
+    queue.put("box/attribute/elapsed", ELAPSED, "00:00:01")
+    queue.put("box/attribute/title", TITLE, "First")
+    queue.put("box/attribute/elapsed", ELAPSED, "00:00:02")
+    queue.put("box/attribute/title", TITLE, "Second")
+
+    assert len(queue) == 2
+    assert queue.coalesced == 2
+    assert queue.pop() == ("box/attribute/title", TITLE, "Second")
+    assert queue.pop() == ("box/attribute/elapsed", ELAPSED, "00:00:02")
+
+
+def test_queue_keeps_every_card_in_order() -> None:
+    """Test that topics exempt from deduplication wait with every payload."""
+    queue = IngressQueue(8)
+    for card in ("1", "2", "1"):
+        queue.put("box/attribute/last_card", LAST_CARD, card)
+
+    assert len(queue) == 3
+    assert queue.coalesced == 0
+    assert [queue.pop()[2] for _ in range(3)] == ["1", "2", "1"]
+
+
+def test_full_queue_sheds_lowest_priority() -> None:
+    """Test that a full queue drops the least important messages first."""
+    queue = IngressQueue(3)
+    queue.put("box/attribute/elapsed", ELAPSED, "00:00:01")
+    queue.put("box/attribute/version", VERSION, "2.2")
+    queue.put("box/attribute/title", TITLE, "Song")
+
+    # The elapsed time and the version make room for the state and the volume
+    assert queue.put("box/state", STATE, "online")
+    assert queue.put("box/attribute/volume", VOLUME, "40")
+    # Nothing less important is waiting
+    assert not queue.put("box/attribute/version", VERSION, "2.3")
+    # A waiting topic takes the new payload without growing the queue
+    assert queue.put("box/attribute/volume", VOLUME, "50")
+
+    assert len(queue) == 3
+    assert queue.peak_depth == 3
+    assert queue.as_dict()["dropped"] == {
+        "state": 0,
+        "control": 0,
+        "metadata": 0,
+        "background": 3,
+    }
+    assert [queue.pop()[0] for _ in range(3)] == [
+        "box/state",
+        "box/attribute/volume",
+        "box/attribute/title",
+    ]
+
+
+def test_flooded_topic_stays_bounded() -> None:
+    """Test that a flood of a topic never grows the queue beyond its bound."""
+    queue = IngressQueue(4)
+    for volume in range(100):
+        queue.put("box/attribute/volume", VOLUME, str(volume))
+    assert len(queue) == 1
+
+    for card in range(100):
+        queue.put("box/attribute/last_card", LAST_CARD, str(card))
+    assert len(queue) == 4
+    assert queue.peak_depth == 4
+    # The oldest messages made room for the newest cards
+    assert [queue.pop()[2] for _ in range(4)] == ["96", "97", "98", "99"]
+
+
+async def test_burst_is_ingested_in_chunks(
+    hass: HomeAssistant, mock_phoniebox: MockConfigEntry
+) -> None:
+    """Test that a burst beyond the time budget is queued and chunked."""
+    coordinator = hass.data[DOMAIN][mock_phoniebox.entry_id]
+    # Without a budget every message waits and each chunk ingests one of them
+    with patch("custom_components.phoniebox.data_coordinator.INGRESS_CHUNK_BUDGET", 0):
+        for second in range(10):
+            async_fire_mqtt_message(
+                hass, "test_phoniebox/attribute/elapsed", f"00:00:{second:02d}"
+            )
+        async_fire_mqtt_message(hass, "test_phoniebox/state", "online")
+        await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, mock_phoniebox)
+    assert diagnostics["ingress_queue"]["coalesced"] == 9
+    assert diagnostics["ingress_queue"]["peak_depth"] == 2
+    assert diagnostics["ingress_queue"]["chunks"] == 2
+    assert diagnostics["ingress_queue"]["depth"] == 0
+    assert not coordinator.ingress
+
+    player = hass.states.get("media_player.phoniebox_test_box")
+    assert player is not None
+    assert player.attributes.get(ATTR_MEDIA_POSITION) == 9
+    state = hass.states.get("sensor.phoniebox_test_box_state")
+    assert state is not None
+    assert state.state == "online"
+
+
+async def test_retained_flood_creates_every_entity(
+    hass: HomeAssistant, mock_phoniebox: MockConfigEntry
+) -> None:
+    """Test that no retained topic of a reconnect flood is lost."""
+    payloads = {
+        "state": "online",
+        "attribute/state": "play",
+        "attribute/volume": "40",
+        "attribute/maxvolume": "90",
+        "attribute/volstep": "5",
+        "attribute/duration": "00:03:00",
+        "attribute/track": "1/10",
+        "attribute/title": "Song",
+        "attribute/artist": "Artist",
+        "attribute/album": "Album",
+        "attribute/albumartist": "Album Artist",
+        "attribute/file": "spotify:track:1",
+        "attribute/last_card": "1234",
+        "attribute/mute": "false",
+        "attribute/random": "false",
+        "attribute/repeat": "false",
+        "attribute/gpio": "true",
+        "attribute/rfid": "true",
+        "attribute/version": "2.2",
+        "attribute/edition": "classic",
+        "attribute/throttling": "0x0",
+        "attribute/temperature": "45.6'C",
+        "attribute/disk_avail": "10",
+        "attribute/disk_total": "32",
+    }
+    assert len(payloads) > 16
+    # Every message of the flood waits in the ingress queue
+    with patch("custom_components.phoniebox.data_coordinator.INGRESS_CHUNK_BUDGET", 0):
+        for topic, payload in payloads.items():
+            async_fire_mqtt_message(hass, f"test_phoniebox/{topic}", payload)
+        await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, mock_phoniebox)
+    assert diagnostics["ingress_queue"]["peak_depth"] == len(payloads)
+    assert not any(diagnostics["ingress_queue"]["dropped"].values())
+
+    entity_ids = {
+        entry.entity_id
+        for entry in er.async_entries_for_config_entry(
+            er.async_get(hass), mock_phoniebox.entry_id
+        )
+    }
+    for key, descriptor in ATTRIBUTE_DESCRIPTORS.items():
+        for platform in descriptor.platforms - {MEDIA_PLAYER}:
+            entity_id = f"{platform}.phoniebox_test_box_{slugify(descriptor.name)}"
+            assert entity_id in entity_ids, key
+            state = hass.states.get(entity_id)
+            assert state is not None
+            assert state.state not in (STATE_UNKNOWN, STATE_UNAVAILABLE), key
+
+
+async def test_card_flood_is_bounded(
+    hass: HomeAssistant, mock_phoniebox: MockConfigEntry
+) -> None:
+    """Test that a flood of a topic exempt from deduplication stays bounded."""
+    coordinator = hass.data[DOMAIN][mock_phoniebox.entry_id]
+    coordinator.ingress = IngressQueue(8)
+    with patch("custom_components.phoniebox.data_coordinator.INGRESS_CHUNK_BUDGET", 0):
+        for card in range(50):
+            async_fire_mqtt_message(
+                hass, "test_phoniebox/attribute/last_card", str(card)
+            )
+        assert len(coordinator.ingress) <= 8
+        await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, mock_phoniebox)
+    assert diagnostics["ingress_queue"]["peak_depth"] == 8
+    assert diagnostics["ingress_queue"]["dropped"]["control"] > 0
+    state = hass.states.get("sensor.phoniebox_test_box_last_card")
+    assert state is not None
+    assert state.state == "49"
@@ -1,7 +1,17 @@
 """Test integration_blueprint setup process."""
 
+import json
+from collections.abc import Callable
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import STATE_OFF, STATE_ON, STATE_UNAVAILABLE
 from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_mqtt_message,
+)
 
 from custom_components.phoniebox import (
     DataCoordinator,
@@ -10,7 +20,13 @@ from custom_components.phoniebox import (
     async_setup_entry,
     async_unload_entry,
 )
-from custom_components.phoniebox.const import DOMAIN, MEDIA_PLAYER
+from custom_components.phoniebox.const import (
+    CONF_INGESTION_MODE,
+    DOMAIN,
+    INGESTION_MODE_TOPICS,
+    MEDIA_PLAYER,
+    SENSOR,
+)
 
 
 # We can pass fixtures as defined in conftest.py to tell pytest to use the fixture
@@ -45,3 +61,171 @@ async def test_setup_unload_and_reload_entry(
     # Unload the entry and verify that the data has been removed
     assert await async_unload_entry(hass, config_entry)
     assert config_entry.entry_id not in hass.data[DOMAIN]
+
+
+async def test_subscriptions_follow_enabled_platforms(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> None:
+    """Test that only the topics of the enabled platforms are subscribed."""
+    mock_config_entry.add_to_hass(hass)
+    with patch(
+        "custom_components.phoniebox.mqtt_client.mqtt.async_subscribe",
+        new_callable=AsyncMock,
+        return_value=MagicMock(),
+    ) as mock_subscribe:
+        assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+
+        topics = [call.args[1] for call in mock_subscribe.call_args_list]
+        # Until the box is known to publish bulk state both are subscribed
+        assert sorted(topics) == [
+            "test_phoniebox/attribute/+",
+            "test_phoniebox/attributes",
+            "test_phoniebox/state",
+        ]
+
+        mock_subscribe.reset_mock()
+        hass.config_entries.async_update_entry(
+            mock_config_entry,
+            options={MEDIA_PLAYER: False, SENSOR: False},
+        )
+        await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][mock_config_entry.entry_id]
+    topics = [call.args[1] for call in mock_subscribe.call_args_list]
+    assert topics == [
+        "test_phoniebox/attribute/gpio",
+        "test_phoniebox/attribute/mute",
+        "test_phoniebox/attribute/random",
+        "test_phoniebox/attribute/repeat",
+        "test_phoniebox/attribute/rfid",
+    ]
+    # The bulk state subscription is kept
+    assert coordinator.mqtt_client.subscription_count == len(topics) + 1
+
+
+async def test_reload_releases_subscriptions(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> None:
+    """Test that reloading does not leave MQTT handlers behind."""
+    live_subscriptions: set[object] = set()
+
+    async def fake_subscribe(*args: Any, **kwargs: Any) -> Callable[[], None]:
+        token = object()
+        live_subscriptions.add(token)
+        return lambda: live_subscriptions.discard(token)
+
+    mock_config_entry.add_to_hass(hass)
+    with patch(
+        "custom_components.phoniebox.mqtt_client.mqtt.async_subscribe",
+        side_effect=fake_subscribe,
+    ):
+        assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+        handler_count = len(live_subscriptions)
+        assert handler_count > 0
+
+        for _ in range(100):
+            await async_reload_entry(hass, mock_config_entry)
+            await hass.async_block_till_done()
+
+        assert len(live_subscriptions) == handler_count
+        coordinator = hass.data[DOMAIN][mock_config_entry.entry_id]
+        assert coordinator.mqtt_client.subscription_count == handler_count
+
+        assert await hass.config_entries.async_unload(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert not live_subscriptions
+
+
+async def test_toggle_platform_in_place(
+    hass: HomeAssistant, mock_phoniebox: MockConfigEntry
+) -> None:
+    """Test that toggling a platform keeps the coordinator and other entities."""
+    coordinator = hass.data[DOMAIN][mock_phoniebox.entry_id]
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/version", "2.2")
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/gpio", "true")
+    await hass.async_block_till_done()
+
+    hass.config_entries.async_update_entry(mock_phoniebox, options={SENSOR: False})
+    await hass.async_block_till_done()
+
+    assert hass.data[DOMAIN][mock_phoniebox.entry_id] is coordinator
+    assert SENSOR not in coordinator.platforms
+    # removed entities stay registered and are shown as unavailable
+    version_state = hass.states.get("sensor.phoniebox_test_box_version")
+    assert version_state is not None
+    assert version_state.state == STATE_UNAVAILABLE
+    switch_state = hass.states.get("switch.phoniebox_test_box_gpio")
+    assert switch_state is not None
+    assert switch_state.state == STATE_ON
+
+    hass.config_entries.async_update_entry(mock_phoniebox, options={SENSOR: True})
+    await hass.async_block_till_done()
+
+    assert hass.data[DOMAIN][mock_phoniebox.entry_id] is coordinator
+    assert SENSOR in coordinator.platforms
+    # the re-enabled platform catches up from the last known payloads
+    version_state = hass.states.get("sensor.phoniebox_test_box_version")
+    assert version_state is not None
+    assert version_state.state == "2.2"
+
+
+def _async_publish_bulk_state(hass: HomeAssistant, attributes: dict[str, Any]) -> None:
+    """Publish attributes like a box with bulk state support."""
+    async_fire_mqtt_message(hass, "test_phoniebox/attributes", json.dumps(attributes))
+
+
+async def test_bulk_state_is_ingested(
+    hass: HomeAssistant, mock_phoniebox: MockConfigEntry
+) -> None:
+    """Test that the attributes of the bulk state reach the entities."""
+    coordinator = hass.data[DOMAIN][mock_phoniebox.entry_id]
+    assert coordinator.mqtt_client.subscription_count == 3
+
+    _async_publish_bulk_state(hass, {"version": "2.2", "gpio": True, "unknown": 1})
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.phoniebox_test_box_version").state == "2.2"
+    assert hass.states.get("switch.phoniebox_test_box_gpio").state == STATE_ON
+
+    # The box publishes bulk state, the attribute topics are released
+    assert coordinator.uses_bulk_state
+    assert coordinator.bulk_messages == 1
+    assert coordinator.mqtt_client.subscription_count == 2
+
+    # Unchanged attributes of the next bulk state are deduplicated
+    hits = coordinator.duplicate_hits
+    _async_publish_bulk_state(hass, {"version": "2.2", "gpio": False})
+    await hass.async_block_till_done()
+    assert coordinator.duplicate_hits == hits + 1
+    assert hass.states.get("switch.phoniebox_test_box_gpio").state == STATE_OFF
+
+
+async def test_invalid_bulk_state_is_ignored(
+    hass: HomeAssistant, mock_phoniebox: MockConfigEntry
+) -> None:
+    """Test that malformed bulk state keeps the attribute topics."""
+    coordinator = hass.data[DOMAIN][mock_phoniebox.entry_id]
+    async_fire_mqtt_message(hass, "test_phoniebox/attributes", "{not json")
+    async_fire_mqtt_message(hass, "test_phoniebox/attributes", "[1, 2]")
+    await hass.async_block_till_done()
+
+    assert not coordinator.uses_bulk_state
+    assert coordinator.bulk_messages == 0
+    assert coordinator.mqtt_client.subscription_count == 3
+
+
+async def test_topics_ingestion_mode(
+    hass: HomeAssistant, mock_phoniebox: MockConfigEntry
+) -> None:
+    """Test that the topics mode never subscribes the bulk state."""
+    coordinator = hass.data[DOMAIN][mock_phoniebox.entry_id]
+    hass.config_entries.async_update_entry(
+        mock_phoniebox, options={CONF_INGESTION_MODE: INGESTION_MODE_TOPICS}
+    )
+    await hass.async_block_till_done()
+
+    assert coordinator.ingestion_mode == INGESTION_MODE_TOPICS
+    assert coordinator.mqtt_client.subscription_count == 2
@@ -0,0 +1,130 @@
+"""Tests for the command round-trip latency."""
+
+from homeassistant.components.media_player import ATTR_MEDIA_VOLUME_LEVEL
+from homeassistant.const import ATTR_ENTITY_ID, SERVICE_VOLUME_SET
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_mqtt_message,
+)
+
+from custom_components.phoniebox.const import DOMAIN
+from custom_components.phoniebox.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.phoniebox.latency import LatencyHistogram, RoundTripTracker
+
+
+def test_histogram_percentiles() -> None:
+    """Test that percentiles are within a bucket of the recorded latencies."""
+    histogram = LatencyHistogram(100)
+    assert histogram.percentile(50) is None
+
+    for _ in range(90):
+        histogram.record(0.010)
+    for _ in range(10):
+        histogram.record(1.0)
+
+    assert 10 <= histogram.percentile(50) <= 12.5
+    assert 1000 <= histogram.percentile(95) <= 1250
+    assert 1000 <= histogram.percentile(99) <= 1250
+
+
+def test_histogram_window_rolls() -> None:
+    """Test that only the most recent latencies are taken into account."""
+    histogram = LatencyHistogram(10)
+    for _ in range(10):
+        histogram.record(1.0)
+    for _ in range(10):
+        histogram.record(0.010)
+
+    assert len(histogram) == 10
+    assert histogram.percentile(99) <= 12.5
+
+
+def test_round_trip_matching() -> None:
+    """Test that a command is matched with the report of its attribute."""
+    now = 0.0
+    tracker = RoundTripTracker(
+        lambda: now, {"setvolume": "volume", "playerpause": "state"}, 10, 16
+    )
+
+    tracker.async_command_sent("setvolume")
+    tracker.async_command_sent("scan")
+    now = 0.1
+    # A newer command restarts the round trip
+    tracker.async_command_sent("setvolume")
+    now = 0.2
+    tracker.async_attribute_reported("title")
+    tracker.async_attribute_reported("volume")
+    # Only the first report ends the round trip
+    tracker.async_attribute_reported("volume")
+
+    tracker.async_command_sent("playerpause")
+    now = 30.0
+    tracker.async_attribute_reported("state")
+
+    assert tracker.matched == 1
+    assert tracker.expired == 1
+    assert 100 <= tracker.histogram.percentile(50) <= 125
+
+
+async def test_latency_sensors(
+    hass: HomeAssistant, mock_phoniebox: MockConfigEntry
+) -> None:
+    """Test that the round trip percentiles are exposed as sensors."""
+    sensor_state = hass.states.get("sensor.phoniebox_test_box_command_latency_p95")
+    assert sensor_state is not None
+    assert sensor_state.state == "unknown"
+
+    async_fire_mqtt_message(hass, "test_phoniebox/state", "online")
+    await hass.async_block_till_done()
+    await hass.services.async_call(
+        "media_player",
+        SERVICE_VOLUME_SET,
+        {
+            ATTR_ENTITY_ID: "media_player.phoniebox_test_box",
+            ATTR_MEDIA_VOLUME_LEVEL: 0.3,
+        },
+        blocking=True,
+    )
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/volume", "30")
+    await hass.async_block_till_done()
+
+    for percentile in (50, 95, 99):
+        sensor_state = hass.states.get(
+            f"sensor.phoniebox_test_box_command_latency_p{percentile}"
+        )
+        assert sensor_state is not None
+        assert float(sensor_state.state) > 0
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, mock_phoniebox)
+    assert diagnostics["round_trips"]["matched"] == 1
+
+
+async def test_unchanged_report_ends_no_round_trip(
+    hass: HomeAssistant, mock_phoniebox: MockConfigEntry
+) -> None:
+    """Test that only a report changing the attribute ends the round trip."""
+    async_fire_mqtt_message(hass, "test_phoniebox/state", "online")
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/volume", "30")
+    await hass.async_block_till_done()
+    await hass.services.async_call(
+        "media_player",
+        SERVICE_VOLUME_SET,
+        {
+            ATTR_ENTITY_ID: "media_player.phoniebox_test_box",
+            ATTR_MEDIA_VOLUME_LEVEL: 0.5,
+        },
+        blocking=True,
+    )
+    round_trips = hass.data[DOMAIN][mock_phoniebox.entry_id].mqtt_client.round_trips
+
+    # The box re-publishes the volume before acting on the command
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/volume", "30")
+    await hass.async_block_till_done()
+    assert round_trips.matched == 0
+
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/volume", "50")
+    await hass.async_block_till_done()
+    assert round_trips.matched == 1
@@ -2,6 +2,7 @@
 
 from unittest.mock import MagicMock
 
+from freezegun.api import FrozenDateTimeFactory
 from homeassistant.components.media_player import (
     MediaPlayerState,
 )
@@ -10,6 +11,7 @@ from homeassistant.components.media_player.const import (
     ATTR_MEDIA_ARTIST,
     ATTR_MEDIA_DURATION,
     ATTR_MEDIA_POSITION,
+    ATTR_MEDIA_POSITION_UPDATED_AT,
     ATTR_MEDIA_REPEAT,
     ATTR_MEDIA_SEEK_POSITION,
     ATTR_MEDIA_SHUFFLE,
@@ -43,14 +45,21 @@ from homeassistant.helpers.entity_registry import RegistryEntry
 from pytest_homeassistant_custom_component.common import (
     MockConfigEntry,
     async_fire_mqtt_message,
+    async_fire_time_changed,
 )
 
 from custom_components.phoniebox.const import (
+    CONF_MQTT_BASE_TOPIC,
+    CONF_OPTIMISTIC,
+    CONF_PHONIEBOX_NAME,
+    DOMAIN,
     MEDIA_PLAYER_STATE_UNKNOWN,
+    OPTIMISTIC_TIMEOUT,
     PHONIEBOX_REPEAT_OFF,
     PHONIEBOX_REPEAT_PLAYLIST,
     PHONIEBOX_REPEAT_SINGLE,
     SUPPORT_MQTTMEDIAPLAYER,
+    TRACK_CHANGE_TIMEOUT,
 )
 
 
@@ -690,7 +699,10 @@ async def test_duration(
 
 
 async def test_track(
-    hass: HomeAssistant, mock_phoniebox: MockConfigEntry, config: dict
+    hass: HomeAssistant,
+    mock_phoniebox: MockConfigEntry,
+    config: dict,
+    freezer: FrozenDateTimeFactory,
 ) -> None:
     """Test the track update."""
     # Initial State
@@ -699,13 +711,13 @@ async def test_track(
     assert phoniebox_state.attributes.get(ATTR_MEDIA_TRACK) is None
 
     async_fire_mqtt_message(hass, "test_phoniebox/attribute/track", "12333")
-    await hass.async_block_till_done()
+    await _async_end_track_change(hass, freezer)
     phoniebox_state = hass.states.get("media_player.phoniebox_test_box")
     assert phoniebox_state is not None
     assert phoniebox_state.attributes.get(ATTR_MEDIA_TRACK) == 12333
 
     async_fire_mqtt_message(hass, "test_phoniebox/attribute/track", "0")
-    await hass.async_block_till_done()
+    await _async_end_track_change(hass, freezer)
     phoniebox_state = hass.states.get("media_player.phoniebox_test_box")
     assert phoniebox_state is not None
     assert phoniebox_state.attributes.get(ATTR_MEDIA_TRACK) == 0
@@ -843,3 +855,272 @@ async def test_bugfix_parse_value(
     phoniebox_state = hass.states.get("media_player.phoniebox_test_box")
     assert phoniebox_state is not None
     assert phoniebox_state.attributes.get(ATTR_MEDIA_VOLUME_LEVEL) == 0.0
+
+
+async def test_base_topic_with_slash(hass: HomeAssistant) -> None:
+    """Test attribute topics below a base topic that contains a slash."""
+    entry = MockConfigEntry(
+        title="Phoniebox Nested",
+        domain=DOMAIN,
+        data={CONF_PHONIEBOX_NAME: "nested_box", CONF_MQTT_BASE_TOPIC: "home/box"},
+        entry_id="nested_box",
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    async_fire_mqtt_message(hass, "home/box/attribute/volume", "50")
+    await hass.async_block_till_done()
+    phoniebox_state = hass.states.get("media_player.phoniebox_nested_box")
+    assert phoniebox_state is not None
+    assert phoniebox_state.attributes.get(ATTR_MEDIA_VOLUME_LEVEL) == 0.5
+
+
+async def test_elapsed_is_interpolated(
+    hass: HomeAssistant,
+    mock_phoniebox: MockConfigEntry,
+    config: dict,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test that elapsed ticks within the drift threshold write no state."""
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/state", "play")
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/elapsed", "00:00:10")
+    await hass.async_block_till_done()
+    phoniebox_state = hass.states.get("media_player.phoniebox_test_box")
+    assert phoniebox_state is not None
+    assert phoniebox_state.attributes.get(ATTR_MEDIA_POSITION) == 10
+    updated_at = phoniebox_state.attributes.get(ATTR_MEDIA_POSITION_UPDATED_AT)
+
+    for second in range(11, 15):
+        freezer.tick(1)
+        async_fire_mqtt_message(
+            hass, "test_phoniebox/attribute/elapsed", f"00:00:{second}"
+        )
+        await hass.async_block_till_done()
+
+    phoniebox_state = hass.states.get("media_player.phoniebox_test_box")
+    assert phoniebox_state is not None
+    assert phoniebox_state.attributes.get(ATTR_MEDIA_POSITION) == 10
+    assert phoniebox_state.attributes.get(ATTR_MEDIA_POSITION_UPDATED_AT) == updated_at
+
+    # seeking moves the position right away
+    freezer.tick(1)
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/elapsed", "00:01:00")
+    await hass.async_block_till_done()
+    phoniebox_state = hass.states.get("media_player.phoniebox_test_box")
+    assert phoniebox_state is not None
+    assert phoniebox_state.attributes.get(ATTR_MEDIA_POSITION) == 60
+
+
+async def _async_end_track_change(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Let the track change transaction time out."""
+    await hass.async_block_till_done()
+    freezer.tick(TRACK_CHANGE_TIMEOUT)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+
+async def test_track_change_is_written_once(
+    hass: HomeAssistant,
+    mock_phoniebox: MockConfigEntry,
+    config: dict,
+) -> None:
+    """Test that the metadata of a new track is written in one state."""
+    async_fire_mqtt_message(hass, "test_phoniebox/state", "online")
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][mock_phoniebox.entry_id]
+    writes = coordinator.state_flush.writes
+
+    metadata = {
+        "file": "spotify:track:1",
+        "title": "Awesome Title",
+        "artist": "Artist",
+        "album": "Awesome album",
+        "albumartist": "Album Artist",
+        "track": "3/12",
+        "duration": "00:03:00",
+    }
+    # Each message arrives in a loop iteration of its own
+    for attribute, payload in metadata.items():
+        async_fire_mqtt_message(hass, f"test_phoniebox/attribute/{attribute}", payload)
+        await hass.async_block_till_done()
+        phoniebox_state = hass.states.get("media_player.phoniebox_test_box")
+        assert phoniebox_state is not None
+        if attribute != "duration":
+            # Half updated metadata is never written
+            assert phoniebox_state.attributes.get(ATTR_MEDIA_TITLE) is None
+            assert coordinator.state_flush.writes == writes
+
+    phoniebox_state = hass.states.get("media_player.phoniebox_test_box")
+    assert phoniebox_state is not None
+    assert phoniebox_state.attributes.get(ATTR_MEDIA_TITLE) == "Awesome Title"
+    assert phoniebox_state.attributes.get(ATTR_MEDIA_ARTIST) == "Artist"
+    assert phoniebox_state.attributes.get(ATTR_MEDIA_TRACK) == 3
+    assert phoniebox_state.attributes.get(ATTR_MEDIA_DURATION) == 180
+    assert coordinator.state_flush.writes == writes + 1
+
+
+async def test_track_change_repeating_metadata(
+    hass: HomeAssistant,
+    mock_phoniebox: MockConfigEntry,
+    config: dict,
+) -> None:
+    """Test that a track change only sending the new metadata is written once."""
+    async_fire_mqtt_message(hass, "test_phoniebox/state", "online")
+    for attribute, payload in {
+        "file": "spotify:track:1",
+        "title": "Awesome Title",
+        "artist": "Artist",
+        "album": "Awesome album",
+        "track": "3/12",
+        "duration": "00:03:00",
+    }.items():
+        async_fire_mqtt_message(hass, f"test_phoniebox/attribute/{attribute}", payload)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][mock_phoniebox.entry_id]
+    writes = coordinator.state_flush.writes
+
+    # The next track of the album, artist and album are not sent again
+    for attribute, payload in {
+        "track": "4/12",
+        "file": "spotify:track:2",
+        "title": "Other Title",
+        "duration": "00:04:00",
+    }.items():
+        async_fire_mqtt_message(hass, f"test_phoniebox/attribute/{attribute}", payload)
+        await hass.async_block_till_done()
+        if attribute != "duration":
+            assert coordinator.state_flush.writes == writes
+
+    phoniebox_state = hass.states.get("media_player.phoniebox_test_box")
+    assert phoniebox_state is not None
+    assert phoniebox_state.attributes.get(ATTR_MEDIA_TITLE) == "Other Title"
+    assert phoniebox_state.attributes.get(ATTR_MEDIA_TRACK) == 4
+    assert phoniebox_state.attributes.get(ATTR_MEDIA_ALBUM_NAME) == "Awesome album"
+    assert phoniebox_state.attributes.get(ATTR_MEDIA_ARTIST) == "Artist"
+    assert coordinator.state_flush.writes == writes + 1
+
+
+async def test_incomplete_track_change_times_out(
+    hass: HomeAssistant,
+    mock_phoniebox: MockConfigEntry,
+    config: dict,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test that a track change missing metadata is written on timeout."""
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/file", "spotify:track:2")
+    await hass.async_block_till_done()
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/title", "Other Title")
+    await hass.async_block_till_done()
+    # Attributes other than the metadata are not held back
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/volume", "40")
+    await hass.async_block_till_done()
+    phoniebox_state = hass.states.get("media_player.phoniebox_test_box")
+    assert phoniebox_state is not None
+    assert phoniebox_state.attributes.get(ATTR_MEDIA_TITLE) is None
+    assert phoniebox_state.attributes.get(ATTR_MEDIA_VOLUME_LEVEL) == 0.4
+
+    await _async_end_track_change(hass, freezer)
+    phoniebox_state = hass.states.get("media_player.phoniebox_test_box")
+    assert phoniebox_state is not None
+    assert phoniebox_state.attributes.get(ATTR_MEDIA_TITLE) == "Other Title"
+
+
+async def _async_setup_optimistic(hass: HomeAssistant, config: dict) -> None:
+    """Set up a phoniebox with optimistic media player changes."""
+    entry = MockConfigEntry(
+        title="Phoniebox Test",
+        domain=DOMAIN,
+        data=config,
+        entry_id=config[CONF_PHONIEBOX_NAME],
+        options={CONF_OPTIMISTIC: True},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    async_fire_mqtt_message(hass, "test_phoniebox/state", "online")
+    await hass.async_block_till_done()
+
+
+async def test_optimistic_change_is_confirmed(
+    hass: HomeAssistant, config: dict
+) -> None:
+    """Test that optimistic changes show right away and are confirmed."""
+    await _async_setup_optimistic(hass, config)
+    coordinator = hass.data[DOMAIN][config[CONF_PHONIEBOX_NAME]]
+
+    await hass.services.async_call(
+        "media_player",
+        SERVICE_VOLUME_SET,
+        {
+            ATTR_ENTITY_ID: "media_player.phoniebox_test_box",
+            ATTR_MEDIA_VOLUME_LEVEL: 0.6,
+        },
+        blocking=True,
+    )
+    phoniebox_state = hass.states.get("media_player.phoniebox_test_box")
+    assert phoniebox_state is not None
+    assert phoniebox_state.attributes.get(ATTR_MEDIA_VOLUME_LEVEL) == 0.6
+
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/volume", "60")
+    await hass.async_block_till_done()
+    assert coordinator.optimistic_confirmed == 1
+    assert coordinator.optimistic_rolled_back == 0
+
+
+async def test_optimistic_change_is_corrected(
+    hass: HomeAssistant, config: dict
+) -> None:
+    """Test that the value reported by the box wins over the optimistic one."""
+    await _async_setup_optimistic(hass, config)
+    coordinator = hass.data[DOMAIN][config[CONF_PHONIEBOX_NAME]]
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/mute", "false")
+    await hass.async_block_till_done()
+
+    await hass.services.async_call(
+        "media_player",
+        SERVICE_VOLUME_MUTE,
+        {
+            ATTR_ENTITY_ID: "media_player.phoniebox_test_box",
+            ATTR_MEDIA_VOLUME_MUTED: True,
+        },
+        blocking=True,
+    )
+    phoniebox_state = hass.states.get("media_player.phoniebox_test_box")
+    assert phoniebox_state is not None
+    assert phoniebox_state.attributes.get(ATTR_MEDIA_VOLUME_MUTED) is True
+
+    # The box repeats its previous payload, which is applied nonetheless
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/mute", "false")
+    await hass.async_block_till_done()
+    phoniebox_state = hass.states.get("media_player.phoniebox_test_box")
+    assert phoniebox_state is not None
+    assert phoniebox_state.attributes.get(ATTR_MEDIA_VOLUME_MUTED) is False
+    assert coordinator.optimistic_corrected == 1
+
+
+async def test_unconfirmed_optimistic_change_is_rolled_back(
+    hass: HomeAssistant, config: dict, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test that a change the box never reports is rolled back."""
+    await _async_setup_optimistic(hass, config)
+    coordinator = hass.data[DOMAIN][config[CONF_PHONIEBOX_NAME]]
+
+    await hass.services.async_call(
+        "media_player",
+        SERVICE_MEDIA_PLAY,
+        {ATTR_ENTITY_ID: "media_player.phoniebox_test_box"},
+        blocking=True,
+    )
+    phoniebox_state = hass.states.get("media_player.phoniebox_test_box")
+    assert phoniebox_state is not None
+    assert phoniebox_state.state == MediaPlayerState.PLAYING
+
+    freezer.tick(OPTIMISTIC_TIMEOUT)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    phoniebox_state = hass.states.get("media_player.phoniebox_test_box")
+    assert phoniebox_state is not None
+    assert phoniebox_state.state == MediaPlayerState.IDLE
+    assert coordinator.optimistic_rolled_back == 1
@@ -1,15 +1,21 @@
 """Tests for the Phoniebox Sensor."""
 
 from typing import TYPE_CHECKING
+from unittest.mock import patch
 
+from freezegun.api import FrozenDateTimeFactory
 from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTemperature
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import entity_registry as er
 from pytest_homeassistant_custom_component.common import (
     MockConfigEntry,
     async_fire_mqtt_message,
+    async_fire_time_changed,
 )
 
+from custom_components.phoniebox.const import CONF_PHONIEBOX_NAME, DOMAIN
+from custom_components.phoniebox.sensor import discover_sensors
+
 if TYPE_CHECKING:
     from homeassistant.helpers.entity_registry import RegistryEntry
 
@@ -178,3 +184,83 @@ async def test_file_source_sensor(
     sensor_state = hass.states.get("sensor.phoniebox_test_box_source")
     assert sensor_state is not None
     assert sensor_state.state == "file"
+
+
+async def test_sensor_discovery_is_memoized(
+    hass: HomeAssistant, mock_phoniebox: MockConfigEntry, config: dict
+) -> None:
+    """Test that known topics resolve to the existing sensor."""
+    with patch(
+        "custom_components.phoniebox.sensor.discover_sensors",
+        wraps=discover_sensors,
+    ) as mock_discover:
+        async_fire_mqtt_message(hass, "test_phoniebox/attribute/version", "2.2")
+        await hass.async_block_till_done()
+        async_fire_mqtt_message(hass, "test_phoniebox/attribute/version", "2.3")
+        await hass.async_block_till_done()
+        async_fire_mqtt_message(hass, "test_phoniebox/attribute/version", "2.4")
+        await hass.async_block_till_done()
+
+    assert mock_discover.call_count == 1
+    version_sensor_state = hass.states.get("sensor.phoniebox_test_box_version")
+    assert version_sensor_state is not None
+    assert version_sensor_state.state == "2.4"
+
+
+async def test_unchanged_value_writes_no_state(
+    hass: HomeAssistant, mock_phoniebox: MockConfigEntry, config: dict
+) -> None:
+    """Test that payloads resolving to the same value do not write state."""
+    coordinator = hass.data[DOMAIN][mock_phoniebox.entry_id]
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/file", "spotify:a")
+    await hass.async_block_till_done()
+    assert coordinator.suppressed_writes == 0
+
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/file", "spotify:b")
+    await hass.async_block_till_done()
+    assert coordinator.suppressed_writes == 1
+
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/file", "file://a")
+    await hass.async_block_till_done()
+    assert coordinator.suppressed_writes == 1
+    sensor_state = hass.states.get("sensor.phoniebox_test_box_source")
+    assert sensor_state is not None
+    assert sensor_state.state == "file"
+
+
+async def test_min_update_interval_keeps_last_value(
+    hass: HomeAssistant,
+    config: dict,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test that a limited attribute writes its final value after the interval."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data=config,
+        entry_id=config[CONF_PHONIEBOX_NAME],
+        options={"min_update_interval_diagnostic": 60},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    async_fire_mqtt_message(hass, "test_phoniebox/attribute/temperature", "50.0'C")
+    await hass.async_block_till_done()
+    for temperature in ("51.0'C", "52.0'C", "53.0'C"):
+        freezer.tick(10)
+        async_fire_mqtt_message(
+            hass, "test_phoniebox/attribute/temperature", temperature
+        )
+        await hass.async_block_till_done()
+
+    sensor_state = hass.states.get("sensor.phoniebox_test_box_temperature")
+    assert sensor_state is not None
+    assert sensor_state.state == "50.0"
+
+    freezer.tick(30)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    sensor_state = hass.states.get("sensor.phoniebox_test_box_temperature")
+    assert sensor_state is not None
+    assert sensor_state.state == "53.0"
+    assert hass.data[DOMAIN][entry.entry_id].throttled_messages == 3
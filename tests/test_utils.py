@@ -1,6 +1,11 @@
 """Tests for the utils."""
 
+from unittest.mock import MagicMock
+
+from homeassistant.core import HomeAssistant
+
 from custom_components.phoniebox.utils import (
+    EntityAddBatcher,
     bool_to_string,
     parse_float_save,
     parse_int_save,
@@ -86,3 +91,17 @@ def test_string_to_bool() -> None:
     val = string_to_bool("any thing else")
     assert isinstance(val, bool)
     assert val is False
+
+
+async def test_entity_add_batcher(hass: HomeAssistant) -> None:
+    """Test that entities queued in one loop iteration are added at once."""
+    async_add_entities = MagicMock()
+    batcher = EntityAddBatcher(hass, async_add_entities)
+    entities = [MagicMock(), MagicMock(), MagicMock()]
+
+    for entity in entities:
+        batcher(new_entities=(entity,))
+    async_add_entities.assert_not_called()
+
+    await hass.async_block_till_done()
+    async_add_entities.assert_called_once_with(entities)